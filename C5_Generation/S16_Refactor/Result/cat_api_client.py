@@ -2,27 +2,39 @@ import time
 from typing import Dict, Any, List
 
 import requests
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "https://api.thecatapi.com/v1"
 DEFAULT_DELAY = 0.3  # Default delay between API calls to avoid rate limiting
+POOL_MAXSIZE = 10  # Maximum keep-alive connections kept open per host
 
 
 class CatApiClient:
     """Client for interacting with The Cat API"""
 
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, pool_maxsize: int = POOL_MAXSIZE, base_url: str = BASE_URL,
+                 delay: float = DEFAULT_DELAY):
         """
         Initialize the Cat API client
 
         Args:
             api_key: The API key for authentication
+            pool_maxsize: Maximum keep-alive connections kept open per host
+            base_url: Base URL of the API, e.g. a local fake for offline runs
+            delay: Seconds to wait after each write, 0 when replaying recorded traffic
         """
-        self.base_url = BASE_URL
+        self.base_url = base_url
+        self.delay = delay
         self.headers = {
             "x-api-key": api_key,
             "Content-Type": "application/json"
         }
+        # Reuse connections instead of paying TCP and TLS setup on every call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def find_random_image(self) -> Dict[str, Any]:
         """
@@ -34,7 +46,7 @@ class CatApiClient:
         print("Finding a random cat image...")
         search_params = {"limit": 1, "size": "small"}
 
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/images/search",
             params=search_params,
             headers=self.headers
@@ -67,7 +79,7 @@ class CatApiClient:
             "sub_id": sub_id
         }
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/votes",
             json=vote_data,
             headers=self.headers
@@ -77,7 +89,7 @@ class CatApiClient:
             f"Failed to add vote: {response.status_code}, {response.text}"
 
         vote_result = response.json()
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
+        time.sleep(self.delay)  # Small delay to avoid rate limiting
 
         return vote_result
 
@@ -91,7 +103,7 @@ class CatApiClient:
         Returns:
             List of vote dictionaries
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/votes",
             params={"image_id": image_id},
             headers=self.headers
@@ -114,13 +126,13 @@ class CatApiClient:
         """
         print(f"Deleting vote with ID: {vote_id}")
 
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/votes/{vote_id}",
             headers=self.headers
         )
 
         success = response.status_code in [200, 204]
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
+        time.sleep(self.delay)  # Small delay to avoid rate limiting
 
         return success
 
@@ -136,13 +148,13 @@ class CatApiClient:
         """
         print(f"Deleting favorite with ID: {favorite_id}")
 
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/favourites/{favorite_id}",
             headers=self.headers
         )
 
         success = response.status_code in [200, 204]
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
+        time.sleep(self.delay)  # Small delay to avoid rate limiting
 
         return success
 
@@ -156,7 +168,7 @@ class CatApiClient:
         Returns:
             List of favorite dictionaries
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/favourites",
             params={"image_id": image_id},
             headers=self.headers
@@ -1,21 +1,54 @@
+import os
+
 import pytest
 
-from C5_Generation.S16_Refactor.Result.cat_api_client import CatApiClient
+from C5_Generation.S16_Refactor.Result.cat_api_client import CatApiClient, BASE_URL, DEFAULT_DELAY
+from C6_Analysis.S19_Refactor_Builder.Result.cassette import Cassette, RECORD, REPLAY
+from C6_Analysis.S19_Refactor_Builder.Result.fake_cat_api import FakeCatApi
 
 
 # Constants
 API_KEY = "your_cat_api_key_here"  # Replace with your actual API key
+USE_FAKE_API = os.environ.get("CAT_API_FAKE") == "1"  # Run against a local fake instead of the real API
+CASSETTE_PATH = os.environ.get("CAT_API_CASSETTE")  # Replay recorded traffic from this file
+RECORD_CASSETTE = os.environ.get("CAT_API_RECORD") == "1"  # Record into the cassette instead
+
+
+@pytest.fixture(scope="session")
+def fake_cat_api():
+    """
+    Fixture running a local fake of The Cat API on an ephemeral port, stopped after the session.
+
+    Yields:
+        C6_Analysis.S19_Refactor_Builder.Result.fake_cat_api.FakeCatApi: The running fake API
+    """
+    with FakeCatApi() as api:
+        yield api
 
 
 @pytest.fixture
-def api_client():
+def api_client(request):
     """
     Fixture providing a configured API client with proper headers.
+    Set CAT_API_FAKE=1 to point it at the local fake API, and CAT_API_CASSETTE to replay
+    recorded traffic from a cassette (add CAT_API_RECORD=1 to record it).
 
-    Returns:
+    Yields:
         C5_Generation.S16_Refactor.result_cat_api_client.CatApiClient: Configured client for making API requests
     """
-    return CatApiClient(API_KEY)
+    base_url = request.getfixturevalue("fake_cat_api").base_url if USE_FAKE_API else BASE_URL
+    cassette = Cassette(CASSETTE_PATH, mode=RECORD if RECORD_CASSETTE else REPLAY) if CASSETTE_PATH else None
+    delay = 0.0 if cassette is not None and cassette.mode == REPLAY else DEFAULT_DELAY
+
+    client = CatApiClient(API_KEY, base_url=base_url, delay=delay)
+    if cassette is not None:
+        cassette.install(client.session)
+    try:
+        yield client
+    finally:
+        client.session.close()
+        if cassette is not None:
+            cassette.save()
 
 
 @pytest.fixture
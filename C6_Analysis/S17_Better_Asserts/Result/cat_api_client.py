@@ -1,26 +1,58 @@
+import statistics
 import time
 from typing import Dict, Any, List
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from C6_Analysis.S17_Better_Asserts.Result.vote_verification_queue import VoteVerificationQueue
 
 BASE_URL = "https://api.thecatapi.com/v1"
 DEFAULT_DELAY = 0.3  # Default delay between API calls to avoid rate limiting
+POOL_MAXSIZE = 10  # Maximum keep-alive connections kept open per host
+
+# Read-after-write consistency check modes for add_vote
+CONSISTENCY_POLL = "poll"  # Poll until the new vote is visible or the deadline passes
+CONSISTENCY_OFF = "off"  # Trust the POST response and skip the check
+CONSISTENCY_DEFERRED = "deferred"  # Queue new votes and verify them in background batches
+CONSISTENCY_DEADLINE = 5.0  # Seconds to keep polling for a new vote
+POLL_INITIAL_DELAY = 0.05  # First wait between polls, doubled after each miss
+POLL_MAX_DELAY = 1.0  # Upper bound for the wait between polls
 
 class CatApiClient:
     """Client for interacting with The Cat API"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, pool_maxsize: int = POOL_MAXSIZE,
+                 consistency_check: str = CONSISTENCY_POLL,
+                 consistency_deadline: float = CONSISTENCY_DEADLINE):
         """
         Initialize the Cat API client
 
         Args:
             api_key: The API key for authentication
+            pool_maxsize: Maximum keep-alive connections kept open per host
+            consistency_check: How add_vote confirms a vote was persisted ("poll", "deferred" or "off")
+            consistency_deadline: Seconds to keep polling before giving up on a vote
         """
+        assert consistency_check in [CONSISTENCY_POLL, CONSISTENCY_DEFERRED, CONSISTENCY_OFF], \
+            f"Unknown consistency check mode: {consistency_check}"
+        assert consistency_deadline > 0, "Consistency deadline must be positive"
+        self.consistency_check = consistency_check
+        self.consistency_deadline = consistency_deadline
+        self.convergence_times: List[float] = []  # Seconds until each checked vote became visible
+        self.unconfirmed_votes: List[Any] = []  # IDs of votes not visible before the deadline
+        self.verification_queue = None  # Started by the first deferred vote
+
         self.base_url = BASE_URL
         self.headers = {
             "x-api-key": api_key,
             "Content-Type": "application/json"
         }
+        # Reuse connections instead of paying TCP and TLS setup on every call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def add_vote(self, image_id: str, sub_id: str, value: int = 1) -> Dict[str, Any]:
         """
@@ -38,7 +70,7 @@ class CatApiClient:
             "value": value,
             "sub_id": sub_id
         }
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/votes",
             json=vote_data,
             headers=self.headers
@@ -72,40 +104,130 @@ class CatApiClient:
             assert vote_result["sub_id"] == sub_id, \
                 f"Returned sub_id '{vote_result['sub_id']}' doesn't match requested sub_id '{sub_id}'"
 
-        # Verify the vote was actually saved by fetching it right after creation
-        try:
-            # Give the API a moment to process the vote
-            time.sleep(DEFAULT_DELAY)
+        # Verify the vote was actually saved by polling until it shows up
+        if self.consistency_check == CONSISTENCY_POLL:
+            try:
+                self._wait_for_vote(vote_result["id"], sub_id)
+            except Exception as e:
+                print(f"Warning: Could not verify vote persistence: {str(e)}")
+                # We don't fail the test here, as this is a secondary verification
+        elif self.consistency_check == CONSISTENCY_DEFERRED:
+            # Started again after finish_verification, so votes added later are still checked
+            if self.verification_queue is None:
+                self.verification_queue = VoteVerificationQueue(self)
+            self.verification_queue.submit(vote_result["id"])
+
+        return vote_result
+
+    def _is_vote_visible(self, vote_id: Any, sub_id: str) -> bool:
+        """
+        Check once whether a vote appears in the votes list for its sub_id
+
+        Args:
+            vote_id: ID returned when the vote was created
+            sub_id: ID of the voter (user)
 
-            # Fetch votes to verify our vote was recorded
-            votes_response = requests.get(
-                f"{self.base_url}/votes",
-                headers=self.headers,
-                params={"sub_id": sub_id}
-            )
+        Returns:
+            bool: True if the vote is visible
+        """
+        votes_response = self.session.get(
+            f"{self.base_url}/votes",
+            headers=self.headers,
+            params={"sub_id": sub_id}
+        )
 
-            assert votes_response.status_code == 200, \
-                f"Failed to fetch votes: {votes_response.status_code}, {votes_response.text}"
+        assert votes_response.status_code == 200, \
+            f"Failed to fetch votes: {votes_response.status_code}, {votes_response.text}"
 
-            votes = votes_response.json()
-            assert isinstance(votes, list), f"Votes response is not a list: {votes}"
+        votes = votes_response.json()
+        assert isinstance(votes, list), f"Votes response is not a list: {votes}"
 
-            # Check if our vote is in the list
-            vote_found = False
-            for vote in votes:
-                if (vote.get("id") == vote_result["id"] or
-                        (vote.get("image_id") == image_id and vote.get("sub_id") == sub_id)):
-                    vote_found = True
-                    break
+        # Match on the ID only: an earlier vote by the same user for the same image
+        # would otherwise count as this one before it is visible
+        return any(vote.get("id") == vote_id for vote in votes)
 
-            assert vote_found, f"Newly created vote (id: {vote_result['id']}) not found in votes list"
+    def _wait_for_vote(self, vote_id: Any, sub_id: str) -> float:
+        """
+        Poll with exponential backoff until a new vote is visible
 
-        except Exception as e:
-            print(f"Warning: Could not verify vote persistence: {str(e)}")
-            # We don't fail the test here, as this is a secondary verification
+        Args:
+            vote_id: ID returned when the vote was created
+            sub_id: ID of the voter (user)
 
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
-        return vote_result
+        Returns:
+            float: Seconds it took for the vote to become visible
+        """
+        start = time.monotonic()
+        deadline = start + self.consistency_deadline
+        delay = POLL_INITIAL_DELAY
+
+        while True:
+            if self._is_vote_visible(vote_id, sub_id):
+                elapsed = time.monotonic() - start
+                self.convergence_times.append(elapsed)
+                return elapsed
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.unconfirmed_votes.append(vote_id)
+                assert False, f"Newly created vote (id: {vote_id}) not found in votes list " \
+                              f"after {self.consistency_deadline}s"
+
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX_DELAY)
+
+    def finish_verification(self) -> List[Any]:
+        """
+        Wait for deferred verification to complete
+
+        Returns:
+            List of IDs of votes that could not be confirmed
+        """
+        if self.verification_queue is None:
+            return list(self.unconfirmed_votes)
+        unconfirmed = self.verification_queue.finish(self.consistency_deadline)
+        self.unconfirmed_votes.extend(unconfirmed)
+        self.verification_queue = None
+        return unconfirmed
+
+    def get_votes_page(self, page: int = 0, limit: int = 100, order: str = "DESC") -> List[Dict[str, Any]]:
+        """
+        Get a single page of the account's votes
+
+        Args:
+            page: Zero-based page number
+            limit: Number of votes per page
+            order: "DESC" for newest first, "ASC" for oldest first
+
+        Returns:
+            List of vote dictionaries on that page
+        """
+        response = self.session.get(
+            f"{self.base_url}/votes",
+            params={"limit": limit, "page": page, "order": order},
+            headers=self.headers
+        )
+
+        assert response.status_code == 200, \
+            f"Failed to get votes page {page}: {response.status_code}, {response.text}"
+
+        return response.json()
+
+    def consistency_stats(self) -> Dict[str, Any]:
+        """
+        Summarize how long new votes took to become visible
+
+        Returns:
+            Dict with the number of checked and unconfirmed votes and convergence times in seconds
+        """
+        times = self.convergence_times
+        return {
+            "checked": len(times) + len(self.unconfirmed_votes),
+            "unconfirmed": len(self.unconfirmed_votes),
+            "min": round(min(times), 4) if times else None,
+            "median": round(statistics.median(times), 4) if times else None,
+            "max": round(max(times), 4) if times else None
+        }
 
     def find_random_image(self) -> Dict[str, Any]:
         """
@@ -117,7 +239,7 @@ class CatApiClient:
         print("Finding a random cat image...")
         search_params = {"limit": 1, "size": "small"}
 
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/images/search",
             params=search_params,
             headers=self.headers
@@ -141,7 +263,7 @@ class CatApiClient:
         Returns:
             List of vote dictionaries
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/votes",
             params={"image_id": image_id},
             headers=self.headers
@@ -164,7 +286,7 @@ class CatApiClient:
         """
         print(f"Deleting vote with ID: {vote_id}")
 
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/votes/{vote_id}",
             headers=self.headers
         )
@@ -186,7 +308,7 @@ class CatApiClient:
         """
         print(f"Deleting favorite with ID: {favorite_id}")
 
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/favourites/{favorite_id}",
             headers=self.headers
         )
@@ -206,7 +328,7 @@ class CatApiClient:
         Returns:
             List of favorite dictionaries
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/favourites",
             params={"image_id": image_id},
             headers=self.headers
@@ -0,0 +1,154 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+BATCH_SIZE = 100  # Pending votes that trigger a verification pass
+BATCH_INTERVAL = 2.0  # Seconds between verification passes when batches fill slowly
+PAGE_SIZE = 100  # Votes requested per page during a verification pass
+MAX_PAGES = 10  # Pages read per pass when vote IDs can't be ordered
+FINISH_DEADLINE = 10.0  # Seconds to keep re-checking unconfirmed votes at the end
+FINISH_POLL_DELAY = 0.5  # Wait between final verification passes
+
+
+class VoteVerificationQueue:
+    """Verifies created votes in batches on a background thread"""
+
+    def __init__(self, client, batch_size: int = BATCH_SIZE, interval: float = BATCH_INTERVAL,
+                 page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES):
+        """
+        Initialize the verification queue and start its worker
+
+        Args:
+            client: The CatApiClient used to list votes
+            batch_size: Pending votes that trigger a verification pass
+            interval: Seconds between passes when fewer than batch_size votes are pending
+            page_size: Votes requested per page while verifying
+            max_pages: Pages read per pass when vote IDs are not numbers and can't be ordered
+        """
+        assert batch_size > 0, "Batch size must be positive"
+        assert page_size > 0, "Page size must be positive"
+        assert max_pages > 0, "Max pages must be positive"
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self._pending = set()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.submitted = 0
+        self.confirmed = 0
+        self.passes = 0
+        self.pages_read = 0
+
+        self._worker = threading.Thread(target=self._run, name="vote-verifier", daemon=True)
+        self._worker.start()
+
+    def submit(self, vote_id: Any) -> None:
+        """
+        Queue a created vote for verification
+
+        Args:
+            vote_id: ID returned when the vote was created
+        """
+        with self._condition:
+            self._pending.add(vote_id)
+            self.submitted += 1
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.batch_size,
+                    timeout=self.interval
+                )
+                if self._closed:
+                    return
+                if not self._pending:
+                    continue
+            try:
+                self._verify_pending()
+            except Exception as e:
+                print(f"Warning: Vote verification pass failed: {str(e)}")
+
+    def _verify_pending(self) -> None:
+        """
+        Page through the account's votes, newest first, ticking off pending IDs
+        A pass stops once it reaches votes older than the oldest pending one, so votes that are
+        not visible yet cost a page or two instead of a read of the whole account.
+        """
+        with self._condition:
+            looking_for = set(self._pending)
+            self.passes += 1
+        # Vote IDs increase with creation time; without numeric IDs a pass reads at most max_pages
+        oldest = min(looking_for) if all(isinstance(vote_id, int) for vote_id in looking_for) else None
+
+        page = 0
+        while looking_for:
+            votes = self.client.get_votes_page(page, self.page_size, order="DESC")
+            with self._condition:
+                self.pages_read += 1
+
+            found = {vote.get("id") for vote in votes} & looking_for
+            if found:
+                looking_for -= found
+                with self._condition:
+                    self._pending -= found
+                    self.confirmed += len(found)
+
+            if len(votes) < self.page_size:
+                break
+            last_id = votes[-1].get("id")
+            if oldest is not None and isinstance(last_id, int) and last_id < oldest:
+                break
+            page += 1
+            if oldest is None and page >= self.max_pages:
+                break
+
+    def finish(self, deadline: float = FINISH_DEADLINE) -> List[Any]:
+        """
+        Stop the worker and re-check remaining votes until the deadline
+
+        Args:
+            deadline: Seconds to keep re-checking votes that are not yet visible
+
+        Returns:
+            List of vote IDs that could not be confirmed
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+
+        end = time.monotonic() + deadline
+        while self._pending:
+            self._verify_pending()
+            if not self._pending or time.monotonic() >= end:
+                break
+            time.sleep(min(FINISH_POLL_DELAY, max(0.0, end - time.monotonic())))
+
+        unconfirmed = sorted(self._pending, key=str)
+        print(f"Verified {self.confirmed}/{self.submitted} votes in {self.passes} passes "
+              f"({self.pages_read} pages read)")
+        if unconfirmed:
+            print(f"Warning: {len(unconfirmed)} votes could not be confirmed: {unconfirmed}")
+        return unconfirmed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize the verification work done so far
+
+        Returns:
+            Dict with submitted, confirmed and pending vote counts, passes and pages read
+        """
+        with self._condition:
+            return {
+                "submitted": self.submitted,
+                "confirmed": self.confirmed,
+                "pending": len(self._pending),
+                "passes": self.passes,
+                "pages_read": self.pages_read
+            }
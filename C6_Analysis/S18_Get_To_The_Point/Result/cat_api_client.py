@@ -2,19 +2,23 @@ import time
 from typing import Dict, Any, Optional, List
 
 import requests
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "https://api.thecatapi.com/v1"
 DEFAULT_DELAY = 0.5  # Delay between API calls to avoid rate limiting
+POOL_MAXSIZE = 10  # Maximum keep-alive connections kept open per host
+VOTES_PAGE_SIZE = 100  # Votes requested per page when listing votes for an image
 
 class CatApiClient:
     """Wrapper client for interacting with The Cat API"""
 
-    def __init__(self, api_key: str, base_url: str = BASE_URL):
+    def __init__(self, api_key: str, base_url: str = BASE_URL, pool_maxsize: int = POOL_MAXSIZE):
         """
         Initialize the Cat API client
         Args:
             api_key: Your Cat API key
             base_url: The base URL for the Cat API (default: API v1 endpoint)
+            pool_maxsize: Maximum keep-alive connections kept open per host
         """
         self.api_key = api_key
         self.base_url = base_url
@@ -22,6 +26,11 @@ class CatApiClient:
             "x-api-key": api_key,
             "Content-Type": "application/json"
         }
+        # Reuse connections instead of paying TCP and TLS setup on every call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def find_random_image(self, limit: int = 1) -> Dict[str, Any]:
         """
@@ -36,7 +45,7 @@ class CatApiClient:
             "limit": limit,
             "size": "small"  # Use small images to reduce data usage
         }
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/images/search",
             params=params,
             headers=self.headers
@@ -64,7 +73,7 @@ class CatApiClient:
             "value": value,
             "sub_id": sub_id
         }
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/votes",
             json=vote_data,
             headers=self.headers
@@ -98,7 +107,7 @@ class CatApiClient:
         if sub_id:
             params["sub_id"] = sub_id
 
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/votes",
             params=params,
             headers=self.headers
@@ -118,9 +127,23 @@ class CatApiClient:
             List of vote data dictionaries
         """
         print(f"Getting votes for image: {image_id}")
-        all_votes = self.get_votes()
-        image_votes = [vote for vote in all_votes if vote.get("image_id") == image_id]
-        return image_votes
+        image_votes = []
+        page = 0
+        while True:
+            response = self.session.get(
+                f"{self.base_url}/votes",
+                params={"image_id": image_id, "limit": VOTES_PAGE_SIZE, "page": page, "order": "ASC"},
+                headers=self.headers
+            )
+            assert response.status_code == 200, \
+                f"Failed to get votes: {response.status_code}, {response.text}"
+            votes = response.json()
+            # Filter locally too, in case the API ignores the image_id parameter
+            image_votes.extend(vote for vote in votes if vote.get("image_id") == image_id)
+            time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
+            if len(votes) < VOTES_PAGE_SIZE:
+                return image_votes
+            page += 1
 
     def delete_vote(self, vote_id: int) -> bool:
         """
@@ -131,7 +154,7 @@ class CatApiClient:
             True if deletion was successful
         """
         print(f"Deleting vote: {vote_id}")
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/votes/{vote_id}",
             headers=self.headers
         )
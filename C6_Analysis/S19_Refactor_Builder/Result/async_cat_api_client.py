@@ -0,0 +1,137 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient, BASE_URL
+from C6_Analysis.S19_Refactor_Builder.Result.rate_limiter import RateLimiter
+
+DEFAULT_CONCURRENCY = 10  # Requests allowed in flight at once
+
+
+class AsyncCatApiClient:
+    """Asyncio client for The Cat API with the same surface as CatApiClient"""
+
+    def __init__(self, api_key: str, base_url: str = BASE_URL,
+                 max_concurrency: int = DEFAULT_CONCURRENCY,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 client: Optional[CatApiClient] = None):
+        """
+        Initialize the async Cat API client
+        Args:
+            api_key: Your Cat API key
+            base_url: The base URL for the Cat API (default: API v1 endpoint)
+            max_concurrency: Maximum number of requests in flight at once
+            rate_limiter: Rate limiter shared by all requests (default: one token bucket for the key)
+            client: Existing synchronous client to share the pool, rate limiter and validation with
+        """
+        assert max_concurrency > 0, "Concurrency must be positive"
+        self.max_concurrency = max_concurrency
+        # Only a client created here is closed with this one; a shared one stays open for its owner
+        self._owns_client = client is None
+        self.client = client or CatApiClient(
+            api_key,
+            base_url=base_url,
+            pool_maxsize=max_concurrency,
+            rate_limiter=rate_limiter
+        )
+        # Blocking I/O runs on a bounded pool so the event loop never stalls; its size caps requests in flight
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="cat-api")
+
+    async def _call(self, method, *args, **kwargs):
+        """Run a synchronous client method without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    def _list_vote_ids(self) -> List[Any]:
+        """Collect the IDs of every vote page by page (blocking)"""
+        return [vote["id"] for vote in self.client.iter_votes() if vote.get("id")]
+
+    async def find_random_image(self, limit: int = 1) -> Dict[str, Any]:
+        """
+        Find a random cat image
+        Args:
+            limit: Number of images to retrieve (default: 1)
+        Returns:
+            Dict containing image data including 'id' and 'url' keys
+        """
+        return await self._call(self.client.find_random_image, limit)
+
+    async def get_image(self, image_id: str) -> Dict[str, Any]:
+        """
+        Get an image by ID
+        Args:
+            image_id: ID of the image to retrieve
+        Returns:
+            Dict containing image data
+        """
+        return await self._call(self.client.get_image, image_id)
+
+    async def add_vote(self, image_id: str, sub_id: str, value: int = 1) -> Dict[str, Any]:
+        """
+        Add a vote for an image
+        Args:
+            image_id: ID of the image to vote for
+            sub_id: ID of the voter (user)
+            value: Vote value (1 for up, 0 for down)
+        Returns:
+            Dict containing vote data including 'id' key
+        """
+        return await self._call(self.client.add_vote, image_id, sub_id, value)
+
+    async def get_votes(self, sub_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get all votes, optionally filtered by sub_id
+        Args:
+            sub_id: Optional ID of the voter to filter by
+        Returns:
+            List of vote data dictionaries
+        """
+        return await self._call(self.client.get_votes, sub_id)
+
+    async def get_votes_for_image(self, image_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all votes for a specific image
+        Args:
+            image_id: ID of the image to get votes for
+        Returns:
+            List of vote data dictionaries
+        """
+        return await self._call(self.client.get_votes_for_image, image_id)
+
+    async def delete_vote(self, vote_id: int) -> bool:
+        """
+        Delete a vote by ID
+        Args:
+            vote_id: ID of the vote to delete
+        Returns:
+            True if deletion was successful
+        """
+        return await self._call(self.client.delete_vote, vote_id)
+
+    async def delete_all_votes(self) -> int:
+        """
+        Delete all votes created by this client, several at a time
+        Returns:
+            Number of votes deleted
+        """
+        print("Deleting all votes...")
+        # Collect IDs first, deleting while paging would shift the pages
+        vote_ids = await self._call(self._list_vote_ids)
+        results = await asyncio.gather(*(self.delete_vote(vote_id) for vote_id in vote_ids))
+        deleted_count = sum(1 for success in results if success)
+        print(f"Deleted {deleted_count} votes")
+        return deleted_count
+
+    async def close(self) -> None:
+        """Wait for running requests, off the event loop, and close the underlying client if it was created here"""
+        await asyncio.to_thread(self._executor.shutdown, True)
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self) -> 'AsyncCatApiClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
@@ -1,11 +1,16 @@
 import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
 
-from C6_Analysis.S19_Refactor_Builder.result.main_generator import VoteGenerator
-from C6_Analysis.S19_Refactor_Builder.result.userid_strategy import UserIdStrategy
-from C6_Analysis.S19_Refactor_Builder.result.vote_value_strategy import VoteValueStrategy
-from C6_Analysis.S19_Refactor_Builder.result.image_vote_distribution import ImageVoteDistribution
-from C6_Analysis.S19_Refactor_Builder.result.api_client import CatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result.userid_strategy import UserIdStrategy
+from C6_Analysis.S19_Refactor_Builder.Result.vote_value_strategy import VoteValueStrategy
+from C6_Analysis.S19_Refactor_Builder.Result.image_vote_distribution import ImageVoteDistribution
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result.image_pool import DEFAULT_IMAGE_WORKERS
+from C6_Analysis.S19_Refactor_Builder.Result.response_cache import ResponseCache, DEFAULT_MAX_ENTRIES, DEFAULT_TTL
+from C6_Analysis.S19_Refactor_Builder.Result.run_journal import RunJournal
+
+if TYPE_CHECKING:
+    from C6_Analysis.S19_Refactor_Builder.Result.main_generator import VoteGenerator
 
 
 class VoteGeneratorBuilder:
@@ -26,6 +31,11 @@ class VoteGeneratorBuilder:
         self.verify_votes = True
         self.save_results = True
         self.result_filename = None
+        self.stream_results = False
+        self.run_file = None
+        self.concurrency = 1
+        self.ordered_results = True
+        self.image_workers = DEFAULT_IMAGE_WORKERS
         self._alternating_vote_state = True  # For alternating vote values
 
         # For tracking used IDs to avoid duplicates
@@ -133,14 +143,48 @@ class VoteGeneratorBuilder:
         self.verify_votes = verify
         return self
 
+    def with_concurrency(self, workers: int, ordered: bool = True) -> 'VoteGeneratorBuilder':
+        """Cast votes on several worker threads, recording results in plan order or as they finish"""
+        assert workers > 0, "Worker count must be positive"
+        self.concurrency = workers
+        self.ordered_results = ordered
+        return self
+
+    def with_image_workers(self, workers: int) -> 'VoteGeneratorBuilder':
+        """Fetch up to this many specific images at once, voting on each as soon as it arrives"""
+        assert workers > 0, "Worker count must be positive"
+        self.image_workers = workers
+        return self
+
+    def with_image_cache(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                         ttl: Optional[float] = DEFAULT_TTL) -> 'VoteGeneratorBuilder':
+        """Cache fetched images by ID so repeated lookups of the same image skip the API"""
+        assert max_entries > 0, "Cache size must be positive"
+        assert ttl is None or ttl > 0, "Cache TTL must be positive"
+        self.api_client.image_cache = ResponseCache(max_entries, ttl)
+        return self
+
     def with_result_saving(self, save: bool = True, filename: Optional[str] = None) -> 'VoteGeneratorBuilder':
         """Whether to save results to a file"""
         self.save_results = save
         self.result_filename = filename
         return self
 
+    def with_streaming_results(self, stream: bool = True) -> 'VoteGeneratorBuilder':
+        """Append votes, errors and images to a JSONL file as they happen instead of saving at the end"""
+        self.stream_results = stream
+        return self
+
+    def with_run_file(self, filename: str) -> 'VoteGeneratorBuilder':
+        """Journal the run to a file, resuming it with the same images and sub_ids if the file exists"""
+        self.run_file = filename
+        return self
+
     def build(self) -> 'VoteGenerator':
         """Build the vote generator with the current configuration"""
+        # Imported here because main_generator imports this module for its CLI
+        from C6_Analysis.S19_Refactor_Builder.Result.main_generator import VoteGenerator
+
         return VoteGenerator(
             api_client=self.api_client,
             num_votes=self.num_votes,
@@ -150,5 +194,10 @@ class VoteGeneratorBuilder:
             specific_image_ids=self.specific_image_ids,
             verify_votes=self.verify_votes,
             save_results=self.save_results,
-            result_filename=self.result_filename
+            result_filename=self.result_filename,
+            stream_results=self.stream_results,
+            journal=RunJournal(self.run_file) if self.run_file else None,
+            concurrency=self.concurrency,
+            ordered_results=self.ordered_results,
+            image_workers=self.image_workers
         )
@@ -0,0 +1,150 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, TYPE_CHECKING
+
+import requests
+
+from C6_Analysis.S19_Refactor_Builder.Result.retry_policy import CircuitOpenError
+from C6_Analysis.S19_Refactor_Builder.Result.tracing import traced
+
+if TYPE_CHECKING:
+    from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+
+RESOURCES = ["votes", "favourites", "images"]  # Resource types that can be deleted by ID
+DEFAULT_WORKERS = 8  # Deletes in flight at once
+
+DELETED = "deleted"
+NOT_FOUND = "not_found"  # Already gone, which is fine for cleanup
+FAILED = "failed"
+
+
+class BulkReport:
+    """Per-item outcomes of a bulk operation, counted by status"""
+
+    statuses: List[str] = []  # Statuses counted in to_dict, in order
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        self.outcomes: List[Dict[str, Any]] = []
+        self.start_time = time.time()
+        self.end_time = None
+        self._lock = threading.Lock()
+
+    def add_outcome(self, outcome: Dict[str, Any]) -> None:
+        """Record the outcome for one item"""
+        with self._lock:
+            self.outcomes.append(outcome)
+
+    def count(self, status: str) -> int:
+        """Number of items that ended with the given status"""
+        return sum(1 for outcome in self.outcomes if outcome["status"] == status)
+
+    def ids(self, status: str) -> List[Any]:
+        """IDs of the items that ended with the given status"""
+        return [outcome["id"] for outcome in self.outcomes if outcome["status"] == status]
+
+    def finalize(self) -> None:
+        """Mark the bulk operation as complete"""
+        self.end_time = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a dictionary"""
+        report = {"resource": self.resource, "requested": len(self.outcomes)}
+        report.update({status: self.count(status) for status in self.statuses})
+        report.update({
+            "outcomes": self.outcomes,
+            "duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time else None
+        })
+        return report
+
+
+class BulkDeleteReport(BulkReport):
+    """Per-ID outcomes of a bulk delete"""
+
+    statuses = [DELETED, NOT_FOUND, FAILED]
+
+    @property
+    def deleted(self) -> int:
+        """Number of IDs that were deleted"""
+        return self.count(DELETED)
+
+    @property
+    def failed_ids(self) -> List[Any]:
+        """IDs that could not be deleted"""
+        return self.ids(FAILED)
+
+
+class BulkDeleter:
+    """Deletes many votes, favourites or images in parallel under the client's rate limiter"""
+
+    def __init__(self, api_client: 'CatApiClient', max_workers: int = DEFAULT_WORKERS):
+        """
+        Initialize the bulk deleter
+        Args:
+            api_client: The Cat API client, whose DELETE retry policy retries transient failures
+            max_workers: Maximum number of deletes in flight at once
+        """
+        assert max_workers > 0, "Worker count must be positive"
+        self.api_client = api_client
+        self.max_workers = max_workers
+
+    def _delete_one(self, resource: str, resource_id: Any) -> Dict[str, Any]:
+        outcome = {"id": resource_id, "status": FAILED, "status_code": None, "error": None}
+        try:
+            response = self.api_client.delete_resource(resource, resource_id)
+        except (requests.RequestException, CircuitOpenError) as e:
+            # An open circuit fails this ID without aborting the batch
+            outcome["error"] = str(e)
+            return outcome
+
+        outcome["status_code"] = response.status_code
+        if response.status_code in [200, 204]:
+            outcome["status"] = DELETED
+        elif response.status_code == 404:
+            outcome["status"] = NOT_FOUND
+        else:
+            outcome["error"] = response.text
+        return outcome
+
+    @traced()
+    def delete(self, resource: str, resource_ids: Iterable[Any]) -> BulkDeleteReport:
+        """
+        Delete resources by ID
+        Args:
+            resource: One of "votes", "favourites" or "images"
+            resource_ids: IDs to delete
+        Returns:
+            Report with the outcome for every ID
+        """
+        assert resource in RESOURCES, f"Unknown resource type: {resource}"
+        report = BulkDeleteReport(resource)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk-delete") as executor:
+            # Each task runs in a copy of this context so its spans nest under the bulk delete
+            futures = [executor.submit(contextvars.copy_context().run, self._delete_one, resource, resource_id)
+                       for resource_id in resource_ids]
+            for future in futures:
+                outcome = future.result()
+                report.add_outcome(outcome)
+                if outcome["status"] == FAILED:
+                    print(f"Warning: Failed to delete {resource} {outcome['id']}: "
+                          f"{outcome['status_code']}, {outcome['error']}")
+
+        report.finalize()
+        print(f"Deleted {report.deleted}/{len(report.outcomes)} {resource} "
+              f"in {report.to_dict()['duration_seconds']}s")
+        return report
+
+    def delete_votes(self, vote_ids: Iterable[Any]) -> BulkDeleteReport:
+        """Delete votes by ID"""
+        return self.delete("votes", vote_ids)
+
+    def delete_favourites(self, favourite_ids: Iterable[Any]) -> BulkDeleteReport:
+        """Delete favourites by ID"""
+        return self.delete("favourites", favourite_ids)
+
+    def delete_images(self, image_ids: Iterable[Any]) -> BulkDeleteReport:
+        """Delete uploaded images by ID"""
+        return self.delete("images", image_ids)
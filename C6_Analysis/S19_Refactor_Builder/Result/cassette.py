@@ -0,0 +1,240 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+RECORD = "record"  # Always send requests and write every interaction to the cassette
+REPLAY = "replay"  # Answer requests from the cassette
+MODES = [RECORD, REPLAY]
+CASSETTE_VERSION = 1
+SECRET_HEADERS = {"x-api-key", "authorization", "cookie"}  # Never written to disk
+
+
+class UnmatchedRequestError(RuntimeError):
+    """Raised in strict replay mode when the cassette has no recording for a request"""
+
+
+def _request_key(method: str, url: str, body: Optional[bytes]) -> str:
+    """Build the lookup key for a request from its method, path, sorted query and body digest"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    if body:
+        try:
+            # Match JSON bodies by content, whichever codec or key order produced them
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+    digest = hashlib.sha1(body).hexdigest()[:16] if body else "-"
+    return f"{method.upper()} {parts.path}?{query} {digest}"
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(data: Dict[str, str]) -> bytes:
+    if "base64" in data:
+        return base64.b64decode(data["base64"])
+    return data.get("text", "").encode("utf-8")
+
+
+class Cassette:
+    """Request/response recordings stored as gzipped JSON lines and indexed by request"""
+
+    def __init__(self, path: str, mode: str = REPLAY, strict: bool = True):
+        """
+        Initialize the cassette
+        Args:
+            path: Cassette file, e.g. "cassettes/vote_count.jsonl.gz"
+            mode: "record" to send requests and record them, "replay" to answer from the cassette
+            strict: In replay mode, whether an unmatched request fails instead of going to the network
+        """
+        assert mode in MODES, f"Unknown cassette mode: {mode}"
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._interactions: List[Dict[str, Any]] = []
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self.replayed = 0
+        self.recorded = 0
+        self.unmatched = 0
+        self._dirty = False
+        if mode == REPLAY and os.path.exists(path):
+            self._load()
+        assert mode == RECORD or not strict or os.path.exists(path), f"Cassette not found: {path}"
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            assert header.get("version") == CASSETTE_VERSION, \
+                f"Unsupported cassette version in {self.path}: {header.get('version')}"
+            for line in f:
+                self._add(json.loads(line))
+
+    def _add(self, interaction: Dict[str, Any]) -> None:
+        """Append an interaction and index it (caller holds the lock or is loading)"""
+        self._index[interaction["key"]].append(len(self._interactions))
+        self._interactions.append(interaction)
+
+    def save(self) -> Optional[str]:
+        """
+        Write the cassette if anything was recorded
+        Returns:
+            The file name, or None if there was nothing new to write
+        """
+        with self._lock:
+            if not self._dirty:
+                return None
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                f.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+                for interaction in self._interactions:
+                    f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+            os.replace(temp_path, self.path)  # Never leave a half-written cassette behind
+            self._dirty = False
+            return self.path
+
+    def match(self, request: requests.PreparedRequest) -> Optional[Dict[str, Any]]:
+        """
+        Find the recording for a request
+        Identical requests are answered with their recordings in order; once those run out
+        the last one is repeated, so polling loops see the final recorded state.
+        Args:
+            request: The outgoing request
+        Returns:
+            The recorded interaction, or None if the cassette has none
+        """
+        key = _request_key(request.method, request.url, self._body(request))
+        with self._lock:
+            positions = self._index.get(key)
+            if not positions:
+                self.unmatched += 1
+                return None
+            cursor = self._cursors[key]
+            self._cursors[key] = cursor + 1
+            self.replayed += 1
+            return self._interactions[positions[min(cursor, len(positions) - 1)]]
+
+    @staticmethod
+    def _body(request: requests.PreparedRequest) -> Optional[bytes]:
+        body = request.body
+        if isinstance(body, str):
+            return body.encode("utf-8")
+        if isinstance(body, (bytes, bytearray)):
+            return bytes(body)
+        return None  # Streamed bodies can't be matched by content
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        """
+        Store a request and its response
+        Args:
+            request: The request that was sent
+            response: The response received for it
+        """
+        body = self._body(request)
+        interaction = {
+            "key": _request_key(request.method, request.url, body),
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "body": _encode_body(body) if body else None
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() not in SECRET_HEADERS},
+                "body": _encode_body(response.content)
+            }
+        }
+        with self._lock:
+            self._add(interaction)
+            self.recorded += 1
+            self._dirty = True
+
+    def install(self, session: requests.Session) -> None:
+        """
+        Route a session's traffic through this cassette
+        Args:
+            session: Session whose mounted adapters become the transport for recording
+        """
+        for prefix in ["https://", "http://"]:
+            session.mount(prefix, CassetteAdapter(self, session.adapters[prefix]))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of interactions stored, replayed, recorded and unmatched"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "interactions": len(self._interactions),
+                "replayed": self.replayed,
+                "recorded": self.recorded,
+                "unmatched": self.unmatched
+            }
+
+    def __enter__(self) -> 'Cassette':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.save()
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter that records through, or replays instead of, another adapter"""
+
+    def __init__(self, cassette: Cassette, transport: BaseAdapter):
+        """
+        Initialize the adapter
+        Args:
+            cassette: Cassette to record into or replay from
+            transport: Adapter that sends requests over the network
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.transport = transport
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.cassette.mode == REPLAY:
+            interaction = self.cassette.match(request)
+            if interaction is not None:
+                return self._build_response(request, interaction["response"])
+            if self.cassette.strict:
+                raise UnmatchedRequestError(
+                    f"No recording for {request.method} {request.url} in {self.cassette.path}")
+
+        response = self.transport.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    @staticmethod
+    def _build_response(request: requests.PreparedRequest, recorded: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = _decode_body(recorded["body"])
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
@@ -1,21 +1,67 @@
+import contextvars
 import time
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator
 
 import requests
 
-DEFAULT_DELAY = 0.5  # Delay between API calls to avoid rate limiting
+from C6_Analysis.S19_Refactor_Builder.Result.bulk_delete import BulkDeleter, DEFAULT_WORKERS
+from C6_Analysis.S19_Refactor_Builder.Result.cassette import Cassette, REPLAY
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.connection_pool import (
+    ConnectionPoolStats, create_pooled_session, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE
+)
+from C6_Analysis.S19_Refactor_Builder.Result.metrics import ClientMetrics
+from C6_Analysis.S19_Refactor_Builder.Result.rate_limiter import RateLimiter, NoRateLimit
+from C6_Analysis.S19_Refactor_Builder.Result.response_cache import ResponseCache
+from C6_Analysis.S19_Refactor_Builder.Result.retry_policy import RetryPolicy, CircuitBreaker
+from C6_Analysis.S19_Refactor_Builder.Result.single_flight import SingleFlight
+from C6_Analysis.S19_Refactor_Builder.Result.tracing import tracer, traced
+from C6_Analysis.S19_Refactor_Builder.Result.upload import (
+    MultipartStream, UploadSource, ProgressCallback, create_multipart_stream, DEFAULT_CHUNK_SIZE
+)
+
 BASE_URL = "https://api.thecatapi.com/v1"
+VOTES_PAGE_SIZE = 100  # Votes requested per page when streaming vote listings
+FAVOURITES_PAGE_SIZE = 100  # Favourites requested per page when streaming favourite listings
+
+
+def is_duplicate_favourite(response: requests.Response) -> bool:
+    """Whether the API rejected a favourite because the account already has it"""
+    return response.status_code == 400 and "DUPLICATE" in response.text.upper()
 
 
 class CatApiClient:
     """Wrapper client for interacting with The Cat API"""
 
-    def __init__(self, api_key: str, base_url: str = BASE_URL):
+    def __init__(self, api_key: str, base_url: str = BASE_URL,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 pool_block: bool = True,
+                 keep_alive: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 image_cache: Optional[ResponseCache] = None,
+                 retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 coalesce_reads: bool = False,
+                 cassette: Optional[Cassette] = None,
+                 metrics: Optional[ClientMetrics] = None):
         """
         Initialize the Cat API client
         Args:
             api_key: Your Cat API key
             base_url: The base URL for the Cat API (default: API v1 endpoint)
+            pool_connections: Number of per-host connection pools to cache
+            pool_maxsize: Maximum number of connections kept open per host
+            pool_block: Whether threads wait for a free connection instead of opening extra ones
+            keep_alive: Whether connections are reused between requests
+            rate_limiter: Rate limiter shared by all requests (default: one token bucket for the key)
+            image_cache: Optional cache for get_image responses keyed by image ID (default: no caching)
+            retry_policies: Retry policies keyed by endpoint (e.g. "POST /votes") or by method (e.g. "GET")
+            circuit_breaker: Circuit breaker shared by all requests (default: opens after 5 failures in a row)
+            coalesce_reads: Whether concurrent identical vote lookups share a single request
+            cassette: Optional cassette to record traffic into or replay it from
+            metrics: Metrics to record requests into, e.g. shared by several clients (default: new ClientMetrics)
         """
         self.api_key = api_key
         self.base_url = base_url
@@ -23,32 +69,199 @@ class CatApiClient:
             "x-api-key": api_key,
             "Content-Type": "application/json"
         }
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+        self._pool_stats = ConnectionPoolStats(on_wait=self.metrics.record_pool_wait)
+        self.session = create_pooled_session(
+            self._pool_stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive
+        )
+        self.cassette = cassette
+        if cassette is not None:
+            cassette.install(self.session)
+        if rate_limiter is None:
+            # Replayed responses never reach the API, so there is no quota to respect
+            rate_limiter = NoRateLimit() if cassette is not None and cassette.mode == REPLAY else RateLimiter()
+        self.rate_limiter = rate_limiter
+        self.image_cache = image_cache
+        self.retry_policies = {
+            "GET": RetryPolicy(),
+            "DELETE": RetryPolicy(),
+            "POST": RetryPolicy(idempotent=False),  # A resent vote could be counted twice
+            "POST /favourites": RetryPolicy()  # Duplicate favourites are rejected, so resending is safe
+        }
+        self.retry_policies.update(retry_policies or {})
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.single_flight = SingleFlight() if coalesce_reads else None
 
-    def find_random_image(self, limit: int = 1) -> Dict[str, Any]:
+    def _coalesced(self, key: tuple, fn) -> List[Dict[str, Any]]:
+        """Run a vote lookup, sharing it with identical concurrent lookups when coalescing is on"""
+        if self.single_flight is None:
+            return fn()
+        votes = self.single_flight.do(key, fn)
+        # Every caller gets its own copies so one can't modify another's result
+        return [dict(vote) for vote in votes]
+
+    def coalescing_stats(self) -> Dict[str, Any]:
         """
-        Find a random cat image
+        Get request coalescing statistics
+        Returns:
+            Dict with lookups made, requests executed and lookups deduplicated
+        """
+        if self.single_flight is None:
+            return {"calls": 0, "executed": 0, "deduplicated": 0}
+        return self.single_flight.stats()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics
+        Returns:
+            Dict with connections opened and reused, and callers waiting for a connection
+        """
+        return self._pool_stats.snapshot()
+
+    def close(self) -> None:
+        """Close all pooled connections and save any recorded traffic"""
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.save()
+
+    def __enter__(self) -> 'CatApiClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _retry_policy(self, method: str, endpoint: str) -> RetryPolicy:
+        """Find the retry policy for an endpoint, falling back to the one for its method"""
+        return self.retry_policies.get(endpoint) or self.retry_policies.get(method) or RetryPolicy()
+
+    def _request(self, method: str, path: str, endpoint: Optional[str] = None,
+                 **kwargs) -> requests.Response:
+        """
+        Send a request through the circuit breaker and rate limiter, retrying transient failures
+        Args:
+            method: HTTP method
+            path: Path relative to the base URL
+            endpoint: Path template used as the rate limiting and retry key (default: path)
+            kwargs: Passed through to the session; a timeout here replaces the policy's per-attempt one
+        Returns:
+            The final response
+        """
+        endpoint = f"{method} {endpoint or path}"
+        headers = dict(self.headers, **kwargs.pop("headers", {}))
+        policy = self._retry_policy(method, endpoint)
+        timeout = kwargs.pop("timeout", None)
+        started = time.monotonic()
+        delay = None
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_request(endpoint)
+            with tracer.span("rate_limit_wait", endpoint=endpoint):
+                waited = self.rate_limiter.acquire(endpoint)
+            if waited:
+                self.metrics.record_rate_limit_wait(endpoint, waited)
+
+            sent = time.perf_counter()
+            try:
+                with tracer.span(f"HTTP {endpoint}", attempt=attempt) as span:
+                    # Bounded per attempt, so a hung connection can't outlast the policy's deadline
+                    response = self.session.request(
+                        method,
+                        f"{self.base_url}{path}",
+                        headers=headers,
+                        timeout=timeout or policy.attempt_timeout(started),
+                        **kwargs
+                    )
+                    if span:
+                        span.set_attribute("http.status_code", response.status_code)
+            except requests.RequestException as e:
+                self.metrics.record_request(endpoint, type(e).__name__, time.perf_counter() - sent)
+                self.circuit_breaker.record_failure()
+                # Without idempotency only a failed connect is known not to have reached the server
+                retryable = policy.idempotent or isinstance(e, requests.ConnectTimeout)
+                delay = policy.next_delay(delay)
+                if not retryable or not policy.can_retry(attempt, started, delay):
+                    raise
+                print(f"Request to {endpoint} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                self.metrics.record_retry(endpoint)
+                with tracer.span("retry_backoff", endpoint=endpoint):
+                    time.sleep(delay)
+                continue
+
+            body = response.request.body
+            if isinstance(body, (bytes, str)):
+                bytes_out = len(body)
+            else:
+                bytes_out = getattr(body, "bytes_sent", 0)  # Streamed bodies count what they sent
+            self.metrics.record_request(
+                endpoint,
+                response.status_code,
+                time.perf_counter() - sent,
+                bytes_out=bytes_out,
+                bytes_in=len(response.content)
+            )
+
+            retry_after = self.rate_limiter.observe(endpoint, response)
+            if response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+
+            if not policy.should_retry_status(response.status_code):
+                return response
+
+            wait = retry_after if retry_after is not None else policy.next_delay(delay)
+            if not policy.can_retry(attempt, started, wait):
+                return response
+            print(f"{endpoint} returned {response.status_code}, retrying in {wait:.2f}s")
+            self.metrics.record_retry(endpoint)
+            if retry_after is None:
+                # After a 429 the rate limiter already holds the next request back for Retry-After
+                delay = wait
+                with tracer.span("retry_backoff", endpoint=endpoint):
+                    time.sleep(wait)
+
+    @traced()
+    def find_random_images(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Find a page of random cat images
         Args:
             limit: Number of images to retrieve (default: 1)
         Returns:
-            Dict containing image data including 'id' and 'url' keys
+            List of dicts containing image data including 'id' and 'url' keys
         """
-        print("Fetching random cat image...")
+        print(f"Fetching {limit} random cat image(s)...")
         params = {
             "limit": limit,
             "size": "small"  # Use small images to reduce data usage
         }
-        response = requests.get(
-            f"{self.base_url}/images/search",
-            params=params,
-            headers=self.headers
+        response = self._request(
+            "GET",
+            "/images/search",
+            params=params
         )
         assert response.status_code == 200, \
             f"Failed to get images: {response.status_code}, {response.text}"
-        images = response.json()
+        images = json_codec.loads(response.content)
         assert len(images) > 0, "No images found"
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
-        return images[0]
+        return images
 
+    def find_random_image(self, limit: int = 1) -> Dict[str, Any]:
+        """
+        Find a random cat image
+        Args:
+            limit: Number of images to retrieve (default: 1)
+        Returns:
+            Dict containing image data including 'id' and 'url' keys
+        """
+        return self.find_random_images(limit)[0]
+
+    @traced()
     def get_image(self, image_id: str) -> Dict[str, Any]:
         """
         Get an image by ID
@@ -57,17 +270,40 @@ class CatApiClient:
         Returns:
             Dict containing image data
         """
+        if self.image_cache is not None:
+            cached = self.image_cache.get(image_id)
+            if cached is not None:
+                return dict(cached)
+
         print(f"Fetching image: {image_id}")
-        response = requests.get(
-            f"{self.base_url}/images/{image_id}",
-            headers=self.headers
+        response = self._request(
+            "GET",
+            f"/images/{image_id}",
+            endpoint="/images/{image_id}"
         )
         assert response.status_code == 200, \
             f"Failed to get image: {response.status_code}, {response.text}"
-        image = response.json()
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
+        image = json_codec.loads(response.content)
+
+        if self.image_cache is not None:
+            self.image_cache.put(image_id, image)
+            return dict(image)
         return image
 
+    def invalidate_image(self, image_id: Optional[str] = None) -> None:
+        """
+        Drop cached image metadata
+        Args:
+            image_id: ID of the image to drop, or None to drop all cached images
+        """
+        if self.image_cache is None:
+            return
+        if image_id is None:
+            self.image_cache.clear()
+        else:
+            self.image_cache.invalidate(image_id)
+
+    @traced()
     def add_vote(self, image_id: str, sub_id: str, value: int = 1) -> Dict[str, Any]:
         """
         Add a vote for an image
@@ -84,10 +320,10 @@ class CatApiClient:
             "value": value,
             "sub_id": sub_id
         }
-        response = requests.post(
-            f"{self.base_url}/votes",
-            json=vote_data,
-            headers=self.headers
+        response = self._request(
+            "POST",
+            "/votes",
+            data=json_codec.dumps(vote_data)
         )
 
         # Verify status code
@@ -96,16 +332,16 @@ class CatApiClient:
 
         # Verify response is valid JSON
         try:
-            vote_result = response.json()
+            vote_result = json_codec.loads(response.content)
         except ValueError:
             assert False, f"Response is not valid JSON: {response.text}"
 
         # Verify response has the required fields
         assert "id" in vote_result, f"Response missing 'id' field: {vote_result}"
 
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
         return vote_result
 
+    @traced()
     def get_votes(self, sub_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get all votes, optionally filtered by sub_id
@@ -118,17 +354,103 @@ class CatApiClient:
         if sub_id:
             params["sub_id"] = sub_id
 
-        response = requests.get(
-            f"{self.base_url}/votes",
-            params=params,
-            headers=self.headers
+        def fetch() -> List[Dict[str, Any]]:
+            response = self._request(
+                "GET",
+                "/votes",
+                params=params
+            )
+            assert response.status_code == 200, \
+                f"Failed to get votes: {response.status_code}, {response.text}"
+            return json_codec.loads(response.content)
+
+        return self._coalesced(("GET /votes", sub_id), fetch)
+
+    @traced()
+    def get_votes_page(self, page: int = 0, limit: int = VOTES_PAGE_SIZE,
+                       sub_id: Optional[str] = None,
+                       image_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get a single page of votes using the API's filters
+        Args:
+            page: Zero-based page number
+            limit: Number of votes per page
+            sub_id: Optional ID of the voter to filter by
+            image_id: Optional ID of the image to filter by
+        Returns:
+            List of vote data dictionaries on that page
+        """
+        params = {
+            "limit": limit,
+            "page": page,
+            "order": "ASC"  # Stable order so pages don't shift while new votes arrive
+        }
+        if sub_id:
+            params["sub_id"] = sub_id
+        if image_id:
+            params["image_id"] = image_id
+
+        response = self._request(
+            "GET",
+            "/votes",
+            params=params
         )
         assert response.status_code == 200, \
-            f"Failed to get votes: {response.status_code}, {response.text}"
-        votes = response.json()
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
-        return votes
+            f"Failed to get votes page {page}: {response.status_code}, {response.text}"
+        return json_codec.loads(response.content)
+
+    def iter_votes(self, sub_id: Optional[str] = None, image_id: Optional[str] = None,
+                   page_size: int = VOTES_PAGE_SIZE, prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream votes page by page
+        Args:
+            sub_id: Optional ID of the voter to filter by
+            image_id: Optional ID of the image to filter by
+            page_size: Number of votes requested per page
+            prefetch: Whether to fetch the next page in the background while the current one is consumed
+        Yields:
+            Vote data dictionaries
+        """
+        return self._iter_pages(
+            lambda page: self.get_votes_page(page, page_size, sub_id=sub_id, image_id=image_id),
+            page_size, prefetch, image_id
+        )
 
+    @staticmethod
+    def _iter_pages(fetch, page_size: int, prefetch: bool,
+                    image_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a paginated listing
+        Args:
+            fetch: Function returning the items on a zero-based page
+            page_size: Number of items requested per page
+            prefetch: Whether to fetch the next page in the background while the current one is consumed
+            image_id: Optional image ID the listing is filtered by
+        Yields:
+            Item dictionaries
+        """
+        assert page_size > 0, "Page size must be positive"
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") as executor:
+            page = 0
+            items = fetch(page)
+            while True:
+                has_more = len(items) >= page_size
+                next_page = executor.submit(contextvars.copy_context().run, fetch, page + 1) \
+                    if has_more and prefetch else None
+
+                for item in items:
+                    # Filter locally too, in case the API ignores a filter parameter
+                    if image_id and item.get("image_id") != image_id:
+                        continue
+                    yield item
+
+                if not has_more:
+                    return
+                page += 1
+                items = next_page.result() if next_page else fetch(page)
+
+    @traced()
     def get_votes_for_image(self, image_id: str) -> List[Dict[str, Any]]:
         """
         Get all votes for a specific image
@@ -138,10 +460,26 @@ class CatApiClient:
             List of vote data dictionaries
         """
         print(f"Getting votes for image: {image_id}")
-        all_votes = self.get_votes()
-        image_votes = [vote for vote in all_votes if vote.get("image_id") == image_id]
-        return image_votes
+        return self._coalesced(("GET /votes?image_id", image_id),
+                               lambda: list(self.iter_votes(image_id=image_id)))
 
+    @traced()
+    def delete_resource(self, resource: str, resource_id: Any) -> requests.Response:
+        """
+        Send a DELETE for a vote, favourite or uploaded image
+        Args:
+            resource: Resource collection, e.g. "votes", "favourites" or "images"
+            resource_id: ID of the item to delete
+        Returns:
+            The raw response, so callers can decide what counts as success
+        """
+        return self._request(
+            "DELETE",
+            f"/{resource}/{resource_id}",
+            endpoint=f"/{resource}/{{id}}"
+        )
+
+    @traced()
     def delete_vote(self, vote_id: int) -> bool:
         """
         Delete a vote by ID
@@ -151,12 +489,204 @@ class CatApiClient:
             True if deletion was successful
         """
         print(f"Deleting vote: {vote_id}")
-        response = requests.delete(
-            f"{self.base_url}/votes/{vote_id}",
-            headers=self.headers
-        )
+        response = self.delete_resource("votes", vote_id)
         success = response.status_code == 200
         if not success:
             print(f"Warning: Failed to delete vote {vote_id}: {response.status_code}, {response.text}")
-        time.sleep(DEFAULT_DELAY)  # Small delay to avoid rate limiting
         return success
+
+    @traced()
+    def delete_all_votes(self, max_workers: int = DEFAULT_WORKERS) -> int:
+        """
+        Delete all votes created by this client
+        Args:
+            max_workers: Maximum number of deletes in flight at once
+        Returns:
+            Number of votes deleted
+        """
+        print("Deleting all votes...")
+        # Collect IDs first, deleting while paging would shift the pages
+        vote_ids = [vote["id"] for vote in self.iter_votes() if vote.get("id")]
+        report = BulkDeleter(self, max_workers=max_workers).delete_votes(vote_ids)
+        return report.deleted
+
+    @traced()
+    def create_favourite(self, image_id: str, sub_id: Optional[str] = None) -> requests.Response:
+        """
+        Send a POST marking an image as a favourite
+        Args:
+            image_id: ID of the image to favourite
+            sub_id: Optional ID of the user the favourite belongs to
+        Returns:
+            The raw response, so callers can tell duplicates from failures
+        """
+        favourite_data = {"image_id": image_id}
+        if sub_id:
+            favourite_data["sub_id"] = sub_id
+        return self._request(
+            "POST",
+            "/favourites",
+            data=json_codec.dumps(favourite_data)
+        )
+
+    def add_favourite(self, image_id: str, sub_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Mark an image as a favourite
+        Args:
+            image_id: ID of the image to favourite
+            sub_id: Optional ID of the user the favourite belongs to
+        Returns:
+            Dict containing favourite data including 'id' key, the existing favourite if the
+            account already has it (e.g. when a resent request follows one whose response was lost)
+        """
+        print(f"Adding favourite from sub_id: {sub_id} for image: {image_id}")
+        response = self.create_favourite(image_id, sub_id)
+        if is_duplicate_favourite(response):
+            favourite = next((favourite for favourite in self.iter_favourites(sub_id=sub_id, image_id=image_id)
+                              if favourite["image_id"] == image_id and favourite.get("sub_id") == sub_id), None)
+            assert favourite, f"Duplicate favourite not found for image {image_id}: {response.text}"
+            return favourite
+        assert response.status_code in [200, 201], \
+            f"Failed to add favourite: {response.status_code}, {response.text}"
+        favourite = json_codec.loads(response.content)
+        assert "id" in favourite, f"Response missing 'id' field: {favourite}"
+        return favourite
+
+    @traced()
+    def get_favourites_page(self, page: int = 0, limit: int = FAVOURITES_PAGE_SIZE,
+                            sub_id: Optional[str] = None,
+                            image_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get a single page of favourites using the API's filters
+        Args:
+            page: Zero-based page number
+            limit: Number of favourites per page
+            sub_id: Optional ID of the user to filter by
+            image_id: Optional ID of the image to filter by
+        Returns:
+            List of favourite data dictionaries on that page
+        """
+        params = {
+            "limit": limit,
+            "page": page,
+            "order": "ASC"  # Stable order so pages don't shift while new favourites arrive
+        }
+        if sub_id:
+            params["sub_id"] = sub_id
+        if image_id:
+            params["image_id"] = image_id
+
+        response = self._request(
+            "GET",
+            "/favourites",
+            params=params
+        )
+        assert response.status_code == 200, \
+            f"Failed to get favourites page {page}: {response.status_code}, {response.text}"
+        return json_codec.loads(response.content)
+
+    def iter_favourites(self, sub_id: Optional[str] = None, image_id: Optional[str] = None,
+                        page_size: int = FAVOURITES_PAGE_SIZE,
+                        prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream favourites page by page
+        Args:
+            sub_id: Optional ID of the user to filter by
+            image_id: Optional ID of the image to filter by
+            page_size: Number of favourites requested per page
+            prefetch: Whether to fetch the next page in the background while the current one is consumed
+        Yields:
+            Favourite data dictionaries
+        """
+        return self._iter_pages(
+            lambda page: self.get_favourites_page(page, page_size, sub_id=sub_id, image_id=image_id),
+            page_size, prefetch, image_id
+        )
+
+    @traced()
+    def get_favourites_for_image(self, image_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all favourites for a specific image
+        Args:
+            image_id: ID of the image to get favourites for
+        Returns:
+            List of favourite data dictionaries
+        """
+        print(f"Getting favourites for image: {image_id}")
+        return list(self.iter_favourites(image_id=image_id))
+
+    @traced()
+    def delete_favourite(self, favourite_id: int) -> bool:
+        """
+        Delete a favourite by ID
+        Args:
+            favourite_id: ID of the favourite to delete
+        Returns:
+            True if deletion was successful
+        """
+        print(f"Deleting favourite: {favourite_id}")
+        response = self.delete_resource("favourites", favourite_id)
+        success = response.status_code == 200
+        if not success:
+            print(f"Warning: Failed to delete favourite {favourite_id}: {response.status_code}, {response.text}")
+        return success
+
+    @traced()
+    def delete_all_favourites(self, max_workers: int = DEFAULT_WORKERS) -> int:
+        """
+        Delete all favourites created by this client
+        Args:
+            max_workers: Maximum number of deletes in flight at once
+        Returns:
+            Number of favourites deleted
+        """
+        print("Deleting all favourites...")
+        # Collect IDs first, deleting while paging would shift the pages
+        favourite_ids = [favourite["id"] for favourite in self.iter_favourites() if favourite.get("id")]
+        report = BulkDeleter(self, max_workers=max_workers).delete_favourites(favourite_ids)
+        return report.deleted
+
+    @traced()
+    def send_upload(self, stream: MultipartStream) -> requests.Response:
+        """
+        Send a POST uploading an image body
+        Args:
+            stream: Multipart body to stream to the API
+        Returns:
+            The raw response, so callers can tell rejected files from failures
+        """
+        return self._request(
+            "POST",
+            "/images/upload",
+            data=stream,
+            headers={"Content-Type": stream.header}
+        )
+
+    def upload_image(self, source: UploadSource, sub_id: Optional[str] = None,
+                     filename: Optional[str] = None, chunked: bool = False,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Upload an image, streaming it from disk or memory
+        Args:
+            source: File path, bytes-like object, memory map or binary file object
+            sub_id: Optional ID of the user the image belongs to
+            filename: File name sent to the API (default: the path's base name)
+            chunked: Whether to send the body with chunked transfer encoding
+            chunk_size: Bytes read from the source per chunk
+            on_progress: Called with (bytes sent, total bytes or None) after each chunk
+        Returns:
+            Dict containing the uploaded image data including 'id' and 'url' keys
+        """
+        stream = create_multipart_stream(
+            source, chunked=chunked, filename=filename,
+            fields={"sub_id": sub_id} if sub_id else None,
+            chunk_size=chunk_size, on_progress=on_progress
+        )
+        print(f"Uploading image: {stream.filename} ({stream.total_size() or 'unknown'} bytes)")
+        response = self.send_upload(stream)
+        assert response.status_code in [200, 201], \
+            f"Failed to upload image: {response.status_code}, {response.text}"
+        image = json_codec.loads(response.content)
+        assert "id" in image, f"Response missing 'id' field: {image}"
+        return image
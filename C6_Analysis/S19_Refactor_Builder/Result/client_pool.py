@@ -0,0 +1,288 @@
+import itertools
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator, Set, Callable
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.bulk_delete import DEFAULT_WORKERS
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient, BASE_URL
+from C6_Analysis.S19_Refactor_Builder.Result.metrics import ClientMetrics
+from C6_Analysis.S19_Refactor_Builder.Result.rate_limiter import RateLimiter
+from C6_Analysis.S19_Refactor_Builder.Result.response_cache import ResponseCache
+
+MAX_TRACKED_VOTES = 100_000  # Newest vote owners remembered; older votes are deleted by trying every key
+
+
+def key_label(index: int, api_key: str) -> str:
+    """Name a key in stats and logs without revealing it, e.g. "key1 (...3f9a)" """
+    return f"key{index + 1} (...{api_key[-4:]})"
+
+
+class PoolMetrics:
+    """Per-key API metrics of a client pool, with the same outputs as ClientMetrics"""
+
+    def __init__(self, metrics: Dict[str, ClientMetrics]):
+        self._metrics = metrics
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the metrics of every key, keyed by key label"""
+        return {label: metrics.snapshot() for label, metrics in self._metrics.items()}
+
+    def to_json(self) -> str:
+        """Dump the metrics as JSON"""
+        return json_codec.dumps(self.snapshot(), compact=False).decode("utf-8")
+
+    def to_text(self) -> str:
+        """Dump the metrics as a human-readable table per key"""
+        return "\n".join(f"[{label}]\n{metrics.to_text()}" for label, metrics in self._metrics.items())
+
+    def save_to_file(self, filename: str) -> str:
+        """Save the metrics to a file, as JSON if the name ends in .json and as text otherwise"""
+        with open(filename, "w") as f:
+            f.write(self.to_json() if filename.endswith(".json") else self.to_text())
+        return filename
+
+
+class CatApiClientPool:
+    """Spreads requests over several API keys, each with its own quota"""
+
+    def __init__(self, api_keys: List[str], base_url: str = BASE_URL,
+                 rate_limiter_factory: Optional[Callable[[], RateLimiter]] = None, **client_kwargs):
+        """
+        Initialize the client pool
+        Args:
+            api_keys: API keys to spread requests over
+            base_url: The base URL for the Cat API (default: API v1 endpoint)
+            rate_limiter_factory: Creates each key's rate limiter (default: the client's own default)
+            client_kwargs: Passed through to each key's CatApiClient
+        """
+        assert api_keys, "At least one API key is required"
+        assert len(set(api_keys)) == len(api_keys), "API keys must be unique"
+        assert "rate_limiter" not in client_kwargs, "Each key has its own quota, use rate_limiter_factory"
+        assert "metrics" not in client_kwargs, "Each key records its own metrics"
+        self.labels = [key_label(i, api_key) for i, api_key in enumerate(api_keys)]
+        self.clients: Dict[str, CatApiClient] = {
+            label: CatApiClient(api_key, base_url=base_url,
+                                rate_limiter=rate_limiter_factory() if rate_limiter_factory else None,
+                                **client_kwargs)
+            for label, api_key in zip(self.labels, api_keys)
+        }
+        self.metrics = PoolMetrics({label: client.metrics for label, client in self.clients.items()})
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._routed: Dict[str, int] = defaultdict(int)
+        self._tie_breaker = itertools.count()
+        # Votes belong to the account that created them, so reads and deletes go back to that key
+        self._vote_owner: 'OrderedDict[Any, str]' = OrderedDict()
+        self._image_writers: Dict[str, Set[str]] = defaultdict(set)
+        self._sub_id_writers: Dict[str, Set[str]] = defaultdict(set)
+
+    @property
+    def image_cache(self) -> Optional[ResponseCache]:
+        """Image cache shared by every key's client"""
+        return next(iter(self.clients.values())).image_cache
+
+    @image_cache.setter
+    def image_cache(self, cache: Optional[ResponseCache]) -> None:
+        # Image metadata is the same whichever key fetched it, so the keys share one cache
+        for client in self.clients.values():
+            client.image_cache = cache
+
+    def _pick(self, endpoint: str) -> str:
+        """Pick the key with the most budget left for an endpoint (caller holds the lock)"""
+        offset = next(self._tie_breaker)
+
+        def score(item):
+            position, label = item
+            budget = self.clients[label].rate_limiter.budget(endpoint)
+            # Rotate the order so keys with equal budgets take turns
+            return budget - self._in_flight[label], -((position - offset) % len(self.labels))
+
+        return max(enumerate(self.labels), key=score)[1]
+
+    @contextmanager
+    def _route(self, endpoint: str, label: Optional[str] = None) -> Iterator[str]:
+        """
+        Reserve a client for one call
+        Args:
+            endpoint: Endpoint key the call will hit, e.g. "POST /votes"
+            label: Key to use, or None to pick the one with the most budget
+        Yields:
+            The label of the chosen key
+        """
+        with self._lock:
+            label = label or self._pick(endpoint)
+            self._in_flight[label] += 1
+            self._routed[label] += 1
+        try:
+            yield label
+        finally:
+            with self._lock:
+                self._in_flight[label] -= 1
+
+    def _writers(self, image_id: Optional[str] = None, sub_id: Optional[str] = None) -> List[str]:
+        """Keys that may hold votes for an image or voter; all keys if this pool wrote none"""
+        with self._lock:
+            if image_id is not None and image_id in self._image_writers:
+                writers = self._image_writers[image_id]
+            elif sub_id is not None and sub_id in self._sub_id_writers:
+                writers = self._sub_id_writers[sub_id]
+            else:
+                return list(self.labels)
+            return [label for label in self.labels if label in writers]
+
+    def find_random_images(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Find a page of random cat images using the key with the most search budget
+        Args:
+            limit: Number of images to retrieve (default: 1)
+        Returns:
+            List of dicts containing image data including 'id' and 'url' keys
+        """
+        with self._route("GET /images/search") as label:
+            return self.clients[label].find_random_images(limit)
+
+    def find_random_image(self, limit: int = 1) -> Dict[str, Any]:
+        """
+        Find a random cat image
+        Args:
+            limit: Number of images to retrieve (default: 1)
+        Returns:
+            Dict containing image data including 'id' and 'url' keys
+        """
+        return self.find_random_images(limit)[0]
+
+    def get_image(self, image_id: str) -> Dict[str, Any]:
+        """
+        Get an image by ID using the key with the most budget
+        Args:
+            image_id: ID of the image to retrieve
+        Returns:
+            Dict containing image data
+        """
+        with self._route("GET /images/{image_id}") as label:
+            return self.clients[label].get_image(image_id)
+
+    def add_vote(self, image_id: str, sub_id: str, value: int = 1) -> Dict[str, Any]:
+        """
+        Add a vote using the key with the most voting budget
+        Args:
+            image_id: ID of the image to vote for
+            sub_id: ID of the voter (user)
+            value: Vote value (1 for up, 0 for down)
+        Returns:
+            Dict containing vote data including 'id' key
+        """
+        with self._route("POST /votes") as label:
+            vote = self.clients[label].add_vote(image_id, sub_id, value)
+        with self._lock:
+            self._vote_owner[vote["id"]] = label
+            if len(self._vote_owner) > MAX_TRACKED_VOTES:
+                self._vote_owner.popitem(last=False)
+            self._image_writers[image_id].add(label)
+            self._sub_id_writers[sub_id].add(label)
+        return vote
+
+    def get_votes(self, sub_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get votes from every key that voted as this voter
+        Args:
+            sub_id: Optional ID of the voter to filter by
+        Returns:
+            List of vote data dictionaries
+        """
+        votes = []
+        for label in self._writers(sub_id=sub_id):
+            with self._route("GET /votes", label):
+                votes.extend(self.clients[label].get_votes(sub_id))
+        return votes
+
+    def get_votes_for_image(self, image_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all votes for an image from every key that voted on it
+        Args:
+            image_id: ID of the image to get votes for
+        Returns:
+            List of vote data dictionaries
+        """
+        votes = []
+        for label in self._writers(image_id=image_id):
+            with self._route("GET /votes", label):
+                votes.extend(self.clients[label].get_votes_for_image(image_id))
+        return votes
+
+    def iter_votes(self, sub_id: Optional[str] = None, image_id: Optional[str] = None,
+                   **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Stream votes from every key that may hold them, one key after another
+        Args:
+            sub_id: Optional ID of the voter to filter by
+            image_id: Optional ID of the image to filter by
+            kwargs: Passed through to CatApiClient.iter_votes
+        Yields:
+            Vote data dictionaries
+        """
+        for label in self._writers(image_id=image_id, sub_id=sub_id):
+            yield from self.clients[label].iter_votes(sub_id=sub_id, image_id=image_id, **kwargs)
+
+    def delete_vote(self, vote_id: int) -> bool:
+        """
+        Delete a vote with the key that created it
+        Args:
+            vote_id: ID of the vote to delete
+        Returns:
+            True if deletion was successful
+        """
+        with self._lock:
+            # Forget the owner whatever the outcome, so a retry falls back to every key
+            owner = self._vote_owner.pop(vote_id, None)
+        for label in [owner] if owner else self.labels:
+            with self._route("DELETE /votes/{id}", label):
+                if self.clients[label].delete_vote(vote_id):
+                    return True
+        return False
+
+    def delete_all_votes(self, max_workers: int = DEFAULT_WORKERS) -> int:
+        """
+        Delete all votes of every key
+        Args:
+            max_workers: Maximum number of deletes in flight at once per key
+        Returns:
+            Number of votes deleted
+        """
+        deleted = sum(client.delete_all_votes(max_workers) for client in self.clients.values())
+        with self._lock:
+            self._vote_owner.clear()
+            self._image_writers.clear()
+            self._sub_id_writers.clear()
+        return deleted
+
+    def key_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-key routing and quota statistics
+        Returns:
+            Dict keyed by key label with requests routed, calls in flight, rate limiting and vote budget
+        """
+        with self._lock:
+            return {
+                label: {
+                    "routed": self._routed[label],
+                    "in_flight": self._in_flight[label],
+                    "vote_budget": round(client.rate_limiter.budget("POST /votes"), 2),
+                    "rate_limiter": client.rate_limiter.stats()
+                }
+                for label, client in self.clients.items()
+            }
+
+    def close(self) -> None:
+        """Close every key's client"""
+        for client in self.clients.values():
+            client.close()
+
+    def __enter__(self) -> 'CatApiClientPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
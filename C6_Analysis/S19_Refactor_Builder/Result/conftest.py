@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result.fake_cat_api import FakeCatApi
+from C6_Analysis.S19_Refactor_Builder.Result.metrics import ClientMetrics
+from C6_Analysis.S19_Refactor_Builder.Result.rate_limiter import NoRateLimit
+
+# Constants
+API_KEY = "test-api-key"  # The fake accepts any key
+METRICS_FILE = os.environ.get("CAT_API_METRICS_FILE")  # Save API metrics here when the session ends
+
+_session_metrics = ClientMetrics()
+
+
+@pytest.fixture(scope="session")
+def fake_cat_api():
+    """
+    Fixture running a local fake of The Cat API on an ephemeral port, stopped after the session.
+
+    Yields:
+        C6_Analysis.S19_Refactor_Builder.Result.fake_cat_api.FakeCatApi: The running fake API
+    """
+    with FakeCatApi() as api:
+        yield api
+
+
+@pytest.fixture
+def api_client(fake_cat_api):
+    """
+    Fixture providing a client pointed at the fake API, without client-side rate limiting.
+    The fake is reset first so every test starts from an empty account, and the client's
+    requests are counted in the session metrics saved by pytest_sessionfinish.
+
+    Yields:
+        C6_Analysis.S19_Refactor_Builder.Result.cat_api_client.CatApiClient: Configured client
+    """
+    fake_cat_api.reset()
+    client = CatApiClient(API_KEY, base_url=fake_cat_api.base_url, rate_limiter=NoRateLimit(),
+                          metrics=_session_metrics)
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Save the API metrics of the session to CAT_API_METRICS_FILE, if set"""
+    if METRICS_FILE:
+        _session_metrics.save_to_file(METRICS_FILE)
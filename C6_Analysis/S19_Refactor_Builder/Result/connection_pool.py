@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_CONNECTIONS = 10  # Number of per-host pools to keep
+DEFAULT_POOL_MAXSIZE = 10  # Maximum open connections per host
+
+
+class ConnectionPoolStats:
+    """Thread-safe counters describing how the connection pool is used"""
+
+    def __init__(self, on_wait: Optional[Callable[[float], None]] = None):
+        """
+        Initialize the stats
+        Args:
+            on_wait: Optional callback receiving the seconds each caller waited for a connection
+        """
+        self.on_wait = on_wait
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_sent = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_seconds = 0.0
+
+    def connection_opened(self) -> None:
+        """Record a new TCP (and TLS) connection"""
+        with self._lock:
+            self.connections_opened += 1
+
+    def checkout_started(self) -> None:
+        """Record a caller waiting for a connection from the pool"""
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def checkout_finished(self, waited: float) -> None:
+        """Record a caller that got a connection from the pool"""
+        with self._lock:
+            self.waiting -= 1
+            self.requests_sent += 1
+            self.wait_seconds += waited
+        if self.on_wait is not None:
+            self.on_wait(waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters as a dictionary"""
+        with self._lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "connections_reused": max(0, self.requests_sent - self.connections_opened),
+                "requests_sent": self.requests_sent,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "wait_seconds": round(self.wait_seconds, 4)
+            }
+
+
+def _instrumented_pool_class(base_class: type, stats: ConnectionPoolStats) -> type:
+    """Create a urllib3 pool class that reports into the given stats"""
+
+    class InstrumentedConnectionPool(base_class):
+        def _new_conn(self):
+            stats.connection_opened()
+            return super()._new_conn()
+
+        def _get_conn(self, timeout=None):
+            stats.checkout_started()
+            start = time.perf_counter()
+            try:
+                return super()._get_conn(timeout)
+            finally:
+                stats.checkout_finished(time.perf_counter() - start)
+
+    InstrumentedConnectionPool.__name__ = f"Instrumented{base_class.__name__}"
+    return InstrumentedConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter whose connection pools report usage statistics"""
+
+    def __init__(self, stats: ConnectionPoolStats, **kwargs):
+        """
+        Initialize the adapter
+        Args:
+            stats: Stats object shared by all pools created by this adapter
+            kwargs: Passed through to requests' HTTPAdapter
+        """
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _instrumented_pool_class(HTTPConnectionPool, self.stats),
+            "https": _instrumented_pool_class(HTTPSConnectionPool, self.stats)
+        }
+
+
+def create_pooled_session(stats: ConnectionPoolStats,
+                          pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                          pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                          pool_block: bool = True,
+                          keep_alive: bool = True) -> requests.Session:
+    """
+    Create a session backed by a pooled, instrumented adapter
+    Args:
+        stats: Stats object to report pool usage into
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept open per host
+        pool_block: Whether callers wait for a free connection instead of opening extra ones
+        keep_alive: Whether connections are reused between requests
+    Returns:
+        A requests session safe to share between threads
+    """
+    assert pool_connections > 0, "Pool connections must be positive"
+    assert pool_maxsize > 0, "Pool max size must be positive"
+
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(
+        stats,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Fake Cat API server
+
+An in-process stand-in for https://api.thecatapi.com/v1 for offline and high-rate runs.
+It implements image search and lookup, uploads, votes and favourites with
+pagination, and keeps votes, favourites and uploads separate per API key.
+
+Usage:
+  python fake_cat_api.py --port 8080
+"""
+
+import argparse
+import itertools
+import random
+import re
+import string
+import threading
+import time
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+
+API_PREFIX = "/v1"
+DEFAULT_IMAGE_COUNT = 1000  # Images in the searchable catalog
+MAX_SEARCH_LIMIT = 100  # Largest page /images/search returns with an API key
+MAX_SEARCH_LIMIT_WITHOUT_KEY = 10  # Largest page /images/search returns without one
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # Largest accepted upload
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif"
+}
+
+
+class ApiError(Exception):
+    """An error response the fake API sends back"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _paginate(items: List[Dict[str, Any]], query: Dict[str, str]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """Apply order, limit and page parameters and build the pagination headers"""
+    if query.get("order", "ASC").upper() == "DESC":
+        items = list(reversed(items))
+    headers = {"Pagination-Count": str(len(items))}
+    if "limit" not in query:
+        return items, headers
+
+    limit = max(1, int(query["limit"]))
+    page = max(0, int(query.get("page", 0)))
+    headers.update({"Pagination-Page": str(page), "Pagination-Limit": str(limit)})
+    return items[page * limit:(page + 1) * limit], headers
+
+
+class AccountState:
+    """Votes, favourites and uploads that belong to one API key"""
+
+    def __init__(self):
+        self.votes: Dict[int, Dict[str, Any]] = {}
+        self.favourites: Dict[int, Dict[str, Any]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+
+
+class FakeCatApi:
+    """Thread-safe in-memory Cat API served over HTTP on a local port"""
+
+    def __init__(self, image_count: int = DEFAULT_IMAGE_COUNT, seed: int = 0,
+                 requests_per_second: Optional[int] = None, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the fake API
+        Args:
+            image_count: Number of images in the searchable catalog
+            seed: Seed for the catalog and for search results
+            requests_per_second: Optional per-key quota; requests above it get 429 with Retry-After
+            latency: Seconds to wait before answering each request
+            host: Interface to listen on
+            port: Port to listen on (default: an ephemeral port)
+        """
+        self.image_count = image_count
+        self.seed = seed
+        self.requests_per_second = requests_per_second
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all votes, favourites and uploads and rebuild the catalog"""
+        with self._lock:
+            rng = random.Random(self.seed)
+            self._random = random.Random(self.seed + 1)
+            self.images: Dict[str, Dict[str, Any]] = {}
+            for _ in range(self.image_count):
+                image_id = "".join(rng.choices(string.ascii_letters + string.digits, k=9))
+                width, height = rng.choice([(500, 375), (640, 480), (1024, 768), (600, 800)])
+                self.images[image_id] = {
+                    "id": image_id,
+                    "url": f"https://cdn2.thecatapi.com/images/{image_id}.jpg",
+                    "width": width,
+                    "height": height
+                }
+            self._image_ids = list(self.images)
+            self._accounts: Dict[str, AccountState] = {}
+            self._ids = itertools.count(1)
+            self._windows: Dict[str, Tuple[int, int]] = {}
+            self.request_count = 0
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to CatApiClient"""
+        assert self._server is not None, "Server is not running"
+        return f"http://{self.host}:{self._server.server_address[1]}{API_PREFIX}"
+
+    def start(self) -> 'FakeCatApi':
+        """Start serving on a background thread"""
+        assert self._server is None, "Server is already running"
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-cat-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> 'FakeCatApi':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _account(self, api_key: Optional[str]) -> AccountState:
+        """Get the state for an API key (caller holds the lock)"""
+        if not api_key:
+            raise ApiError(401, "AUTHENTICATION_ERROR - you need to send your API Key as the 'x-api-key' header")
+        return self._accounts.setdefault(api_key, AccountState())
+
+    def _check_quota(self, api_key: Optional[str]) -> Dict[str, str]:
+        """Count the request against the key's quota and build the rate limit headers"""
+        if not self.requests_per_second:
+            return {}
+        key = api_key or ""
+        second = int(time.time())
+        with self._lock:
+            window, used = self._windows.get(key, (second, 0))
+            if window != second:
+                window, used = second, 0
+            used += 1
+            self._windows[key] = (window, used)
+        headers = {
+            "X-RateLimit-Limit": str(self.requests_per_second),
+            "X-RateLimit-Remaining": str(max(0, self.requests_per_second - used)),
+            "X-RateLimit-Reset": str(round(window + 1 - time.time(), 3))
+        }
+        if used > self.requests_per_second:
+            headers["Retry-After"] = str(max(1, window + 1 - int(time.time())))
+            raise ApiError(429, "Too many requests", headers)
+        return headers
+
+    def handle(self, method: str, path: str, query: Dict[str, str], api_key: Optional[str],
+               body: bytes, content_type: str) -> Tuple[int, Any, Dict[str, str]]:
+        """
+        Route a request
+        Returns:
+            Status code, JSON-serializable body and extra headers
+        """
+        with self._lock:
+            self.request_count += 1
+        if not path.startswith(API_PREFIX + "/"):
+            raise ApiError(404, f"Cannot {method} {path}")
+        parts = path[len(API_PREFIX) + 1:].strip("/").split("/")
+        headers = self._check_quota(api_key)
+
+        route = (method, parts[0], len(parts))
+        if route == ("GET", "images", 2) and parts[1] == "search":
+            return 200, self._search_images(query, api_key), headers
+        if route == ("POST", "images", 2) and parts[1] == "upload":
+            return 201, self._upload_image(api_key, body, content_type), headers
+        if route == ("GET", "images", 1):
+            items, page_headers = self._list("uploads", api_key, query)
+            return 200, items, dict(headers, **page_headers)
+        if route == ("GET", "images", 2):
+            return 200, self._get_image(parts[1], api_key), headers
+        if route == ("DELETE", "images", 2):
+            self._delete("uploads", api_key, parts[1])
+            return 204, None, headers
+        if route == ("POST", "votes", 1):
+            return 201, self._add_vote(api_key, self._json(body)), headers
+        if route == ("POST", "favourites", 1):
+            return 200, self._add_favourite(api_key, self._json(body)), headers
+        if parts[0] in ["votes", "favourites"]:
+            collection = parts[0]
+            if route == ("GET", collection, 1):
+                items, page_headers = self._list(collection, api_key, query)
+                return 200, items, dict(headers, **page_headers)
+            if route == ("GET", collection, 2):
+                return 200, self._get(collection, api_key, parts[1]), headers
+            if route == ("DELETE", collection, 2):
+                self._delete(collection, api_key, parts[1])
+                return 200, {"message": "SUCCESS"}, headers
+        raise ApiError(404, f"Cannot {method} {path}")
+
+    @staticmethod
+    def _json(body: bytes) -> Dict[str, Any]:
+        try:
+            data = json_codec.loads(body or b"{}")
+        except ValueError:
+            raise ApiError(400, "Body is not valid JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        return data
+
+    def _search_images(self, query: Dict[str, str], api_key: Optional[str]) -> List[Dict[str, Any]]:
+        max_limit = MAX_SEARCH_LIMIT if api_key else MAX_SEARCH_LIMIT_WITHOUT_KEY
+        limit = min(max(1, int(query.get("limit", 1))), max_limit)
+        with self._lock:
+            image_ids = self._random.sample(self._image_ids, min(limit, len(self._image_ids)))
+        return [dict(self.images[image_id]) for image_id in image_ids]
+
+    def _get_image(self, image_id: str, api_key: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            if image_id in self.images:
+                return dict(self.images[image_id])
+            for account in self._accounts.values():
+                if image_id in account.uploads:
+                    return dict(account.uploads[image_id])
+        raise ApiError(400, f"Couldn't find an image matching the passed 'id' of {image_id}")
+
+    def _find_image(self, image_id: Any) -> Dict[str, Any]:
+        """Find a catalog or uploaded image (caller holds the lock)"""
+        if image_id in self.images:
+            return self.images[image_id]
+        for account in self._accounts.values():
+            if image_id in account.uploads:
+                return account.uploads[image_id]
+        raise ApiError(400, "INVALID_IMAGE_ID")
+
+    def _add_vote(self, api_key: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(data.get("image_id"), str):
+            raise ApiError(400, '"image_id" is required')
+        if not isinstance(data.get("value"), int) or isinstance(data.get("value"), bool):
+            raise ApiError(400, '"value" must be a number')
+        with self._lock:
+            account = self._account(api_key)
+            image = self._find_image(data["image_id"])
+            vote = {
+                "id": next(self._ids),
+                "image_id": data["image_id"],
+                "sub_id": data.get("sub_id"),
+                "value": data["value"],
+                "created_at": _now(),
+                "country_code": "US",
+                "image": {"id": image["id"], "url": image["url"]}
+            }
+            account.votes[vote["id"]] = vote
+        return {
+            "message": "SUCCESS",
+            "id": vote["id"],
+            "image_id": vote["image_id"],
+            "sub_id": vote["sub_id"],
+            "value": vote["value"],
+            "country_code": vote["country_code"]
+        }
+
+    def _add_favourite(self, api_key: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(data.get("image_id"), str):
+            raise ApiError(400, '"image_id" is required')
+        with self._lock:
+            account = self._account(api_key)
+            image = self._find_image(data["image_id"])
+            for favourite in account.favourites.values():
+                if favourite["image_id"] == data["image_id"] and favourite["sub_id"] == data.get("sub_id"):
+                    raise ApiError(400, "DUPLICATE_FAVOURITE - favourites are unique for account + image_id + sub_id")
+            favourite = {
+                "id": next(self._ids),
+                "user_id": api_key[:6],
+                "image_id": data["image_id"],
+                "sub_id": data.get("sub_id"),
+                "created_at": _now(),
+                "image": {"id": image["id"], "url": image["url"]}
+            }
+            account.favourites[favourite["id"]] = favourite
+        return {"message": "SUCCESS", "id": favourite["id"]}
+
+    def _upload_image(self, api_key: Optional[str], body: bytes, content_type: str) -> Dict[str, Any]:
+        if not content_type.startswith("multipart/form-data"):
+            raise ApiError(400, "Content-Type must be multipart/form-data")
+        if len(body) > MAX_UPLOAD_BYTES:
+            raise ApiError(413, "File too large")
+
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+        fields, file_name, file_data = {}, None, None
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                file_name = part.get_filename()
+                file_data = part.get_payload(decode=True) or b""
+            elif name:
+                fields[name] = part.get_content().strip()
+
+        if file_data is None:
+            raise ApiError(400, '"file" is required')
+        if not file_data:
+            raise ApiError(400, "File is empty")
+        if not any(file_data.startswith(signature) for signature in IMAGE_SIGNATURES):
+            raise ApiError(400, "Classifcation failed: correct animal not found.")
+
+        with self._lock:
+            account = self._account(api_key)
+            image_id = "".join(self._random.choices(string.ascii_letters + string.digits, k=9))
+            extension = next(ext for sig, ext in IMAGE_SIGNATURES.items() if file_data.startswith(sig))
+            image = {
+                "id": image_id,
+                "url": f"https://cdn2.thecatapi.com/images/{image_id}.{extension}",
+                "sub_id": fields.get("sub_id"),
+                "width": 0,
+                "height": 0,
+                "original_filename": file_name,
+                "size": len(file_data),
+                "created_at": _now(),
+                "pending": 0,
+                "approved": 1
+            }
+            account.uploads[image_id] = image
+        return image
+
+    def _list(self, collection: str, api_key: Optional[str], query: Dict[str, str]):
+        with self._lock:
+            items = [dict(item) for item in getattr(self._account(api_key), collection).values()]
+        for field in ["sub_id", "image_id"]:
+            if field in query:
+                key = "id" if collection == "uploads" and field == "image_id" else field
+                items = [item for item in items if str(item.get(key)) == query[field]]
+        return _paginate(items, query)
+
+    def _get(self, collection: str, api_key: Optional[str], item_id: str) -> Dict[str, Any]:
+        with self._lock:
+            items = getattr(self._account(api_key), collection)
+            if item_id.isdigit() and int(item_id) in items:
+                return dict(items[int(item_id)])
+        raise ApiError(404, "NOT_FOUND")
+
+    def _delete(self, collection: str, api_key: Optional[str], item_id: str) -> None:
+        with self._lock:
+            items = getattr(self._account(api_key), collection)
+            key = item_id if collection == "uploads" else (int(item_id) if item_id.isdigit() else None)
+            if key not in items:
+                raise ApiError(404, "NOT_FOUND")
+            del items[key]
+
+
+def _make_handler(api: FakeCatApi) -> type:
+    """Create a request handler class bound to a fake API instance"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse connections
+        disable_nagle_algorithm = True
+        wbufsize = 64 * 1024  # Send headers and body in one write
+
+        def _read_body(self) -> bytes:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                    if size == 0:
+                        # Skip trailers up to the blank line that ends the body
+                        while self.rfile.readline() not in [b"\r\n", b"\n", b""]:
+                            pass
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _handle(self) -> None:
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            body = self._read_body()
+            if api.latency:
+                time.sleep(api.latency)
+
+            try:
+                status, data, headers = api.handle(
+                    self.command, re.sub("/+", "/", url.path), query,
+                    self.headers.get("x-api-key"), body, self.headers.get("Content-Type", ""))
+            except ApiError as e:
+                status, data, headers = e.status, {"message": e.message}, e.headers
+            except (ValueError, KeyError) as e:
+                status, data, headers = 400, {"message": f"Bad request: {e}"}, {}
+
+            payload = b"" if data is None else json_codec.dumps(data)
+            self.send_response(status)
+            if payload:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_DELETE = _handle
+
+        def log_message(self, format, *args):
+            pass  # Keep test and benchmark output quiet
+
+    return Handler
+
+
+def main():
+    """Run the fake API in the foreground"""
+    parser = argparse.ArgumentParser(description="Run a local fake of The Cat API")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--images", type=int, default=DEFAULT_IMAGE_COUNT,
+                        help="Number of images in the searchable catalog")
+    parser.add_argument("--rate-limit", type=int, default=None,
+                        help="Requests per second allowed per API key")
+    args = parser.parse_args()
+
+    api = FakeCatApi(image_count=args.images, requests_per_second=args.rate_limit,
+                     host=args.host, port=args.port).start()
+    print(f"Fake Cat API listening on {api.base_url} (Ctrl+C to stop)")
+    try:
+        api._thread.join()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
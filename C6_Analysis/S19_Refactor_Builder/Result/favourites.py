@@ -0,0 +1,139 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import requests
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.bulk_delete import (
+    BulkDeleter, BulkReport, BulkDeleteReport, DEFAULT_WORKERS
+)
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import is_duplicate_favourite
+from C6_Analysis.S19_Refactor_Builder.Result.retry_policy import CircuitOpenError
+from C6_Analysis.S19_Refactor_Builder.Result.tracing import traced
+
+if TYPE_CHECKING:
+    from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+
+CREATED = "created"
+DUPLICATE = "duplicate"  # The account already has this favourite, which is fine for seeding
+FAILED = "failed"
+
+
+class BulkCreateReport(BulkReport):
+    """Per-item outcomes of a bulk create"""
+
+    statuses = [CREATED, DUPLICATE, FAILED]
+
+    @property
+    def created(self) -> int:
+        """Number of items that were created"""
+        return self.count(CREATED)
+
+    @property
+    def created_ids(self) -> List[Any]:
+        """IDs of the items that were created"""
+        return self.ids(CREATED)
+
+    @property
+    def failed_items(self) -> List[Dict[str, Any]]:
+        """Outcomes of the items that could not be created"""
+        return [outcome for outcome in self.outcomes if outcome["status"] == FAILED]
+
+
+class FavouritesBatch:
+    """Creates, lists and deletes many favourites in parallel under the client's rate limiter"""
+
+    def __init__(self, api_client: 'CatApiClient', max_workers: int = DEFAULT_WORKERS):
+        """
+        Initialize the batch helper
+        Args:
+            api_client: The Cat API client, whose retry policies retry transient failures
+            max_workers: Maximum number of requests in flight at once
+        """
+        assert max_workers > 0, "Worker count must be positive"
+        self.api_client = api_client
+        self.max_workers = max_workers
+
+    def _create_one(self, image_id: str, sub_id: Optional[str]) -> Dict[str, Any]:
+        outcome = {"image_id": image_id, "sub_id": sub_id, "id": None, "status": FAILED,
+                   "status_code": None, "error": None}
+        try:
+            response = self.api_client.create_favourite(image_id, sub_id)
+        except (requests.RequestException, CircuitOpenError) as e:
+            # An open circuit fails this item without aborting the batch
+            outcome["error"] = str(e)
+            return outcome
+
+        outcome["status_code"] = response.status_code
+        if response.status_code in [200, 201]:
+            outcome["id"] = json_codec.loads(response.content).get("id")
+            outcome["status"] = CREATED
+        elif is_duplicate_favourite(response):
+            outcome["status"] = DUPLICATE
+        else:
+            outcome["error"] = response.text
+        return outcome
+
+    @traced()
+    def create(self, items: Iterable[Tuple[str, Optional[str]]]) -> BulkCreateReport:
+        """
+        Create favourites
+        Args:
+            items: (image_id, sub_id) pairs; sub_id may be None
+        Returns:
+            Report with the outcome for every item, in the order given
+        """
+        report = BulkCreateReport("favourites")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="favourites") as executor:
+            # Each task runs in a copy of this context so its spans nest under the batch
+            futures = [executor.submit(contextvars.copy_context().run, self._create_one, image_id, sub_id)
+                       for image_id, sub_id in items]
+            for future in futures:
+                outcome = future.result()
+                report.add_outcome(outcome)
+                if outcome["status"] == FAILED:
+                    print(f"Warning: Failed to favourite image {outcome['image_id']}: "
+                          f"{outcome['status_code']}, {outcome['error']}")
+
+        report.finalize()
+        print(f"Created {report.created}/{len(report.outcomes)} favourites "
+              f"in {report.to_dict()['duration_seconds']}s")
+        return report
+
+    @traced()
+    def list(self, sub_id: Optional[str] = None, image_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List favourites, fetching the next page while the current one is processed
+        Args:
+            sub_id: Optional ID of the user to filter by
+            image_id: Optional ID of the image to filter by
+        Returns:
+            List of favourite data dictionaries
+        """
+        return list(self.api_client.iter_favourites(sub_id=sub_id, image_id=image_id))
+
+    def delete(self, favourite_ids: Iterable[Any]) -> BulkDeleteReport:
+        """
+        Delete favourites by ID
+        Args:
+            favourite_ids: IDs to delete
+        Returns:
+            Report with the outcome for every ID
+        """
+        return BulkDeleter(self.api_client, self.max_workers).delete_favourites(favourite_ids)
+
+    @traced()
+    def delete_matching(self, sub_id: Optional[str] = None, image_id: Optional[str] = None) -> BulkDeleteReport:
+        """
+        Delete every favourite of a user or image
+        Args:
+            sub_id: Optional ID of the user to filter by
+            image_id: Optional ID of the image to filter by
+        Returns:
+            Report with the outcome for every favourite found
+        """
+        # Collect IDs first, deleting while paging would shift the pages
+        favourite_ids = [favourite["id"] for favourite in self.list(sub_id=sub_id, image_id=image_id)]
+        return self.delete(favourite_ids)
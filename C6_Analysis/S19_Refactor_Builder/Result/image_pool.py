@@ -0,0 +1,136 @@
+import contextvars
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result.tracing import traced
+
+DEFAULT_BATCH_SIZE = 25  # Images requested per search call
+MAX_EMPTY_FETCHES = 3  # Search calls in a row without new images before giving up
+DEFAULT_IMAGE_WORKERS = 4  # Specific images fetched by ID at once
+
+
+class ImagePool:
+    """Hands out unique random images, refilling in the background in batches"""
+
+    def __init__(self, api_client: CatApiClient, batch_size: int = DEFAULT_BATCH_SIZE,
+                 low_water_mark: Optional[int] = None):
+        """
+        Initialize the image pool
+        Args:
+            api_client: The Cat API client
+            batch_size: Images requested per search call
+            low_water_mark: Refill when fewer images than this are left (default: half a batch)
+        """
+        assert batch_size > 0, "Batch size must be positive"
+        self.api_client = api_client
+        self.batch_size = batch_size
+        self.low_water_mark = low_water_mark if low_water_mark is not None else batch_size // 2
+        assert 0 <= self.low_water_mark <= batch_size, "Low water mark must be between 0 and the batch size"
+
+        self._images = deque()
+        self._seen = set()
+        self._condition = threading.Condition()
+        self._refilling = False
+        self._error: Optional[Exception] = None  # Failed refill, raised by the next take() then retried
+        self._exhausted: Optional[Exception] = None  # The search stopped finding new images for good
+        self._still_needed: Optional[int] = None  # Images the caller said it needs after the last take()
+        self._empty_fetches = 0
+        self.fetches = 0
+
+    def _wants_more(self) -> bool:
+        """Whether the pool holds fewer images than are still needed (caller holds the lock)"""
+        if len(self._images) > self.low_water_mark:
+            return False
+        return self._still_needed is None or len(self._images) < self._still_needed
+
+    def _start_refill(self) -> None:
+        """Start a background refill unless one is running (caller holds the lock)"""
+        if self._refilling or self._error is not None or self._exhausted is not None:
+            return
+        self._refilling = True
+        # Run in a copy of the caller's context so the refill is traced under the caller's span
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._refill,), name="image-pool-refill", daemon=True).start()
+
+    @traced()
+    def _refill(self) -> None:
+        try:
+            images = self.api_client.find_random_images(self.batch_size)
+        except Exception as e:
+            with self._condition:
+                self._error = e
+                self._refilling = False
+                self._condition.notify_all()
+            return
+
+        with self._condition:
+            self.fetches += 1
+            self._error = None
+            added = 0
+            for image in images:
+                if image["id"] not in self._seen:
+                    self._seen.add(image["id"])
+                    self._images.append(image)
+                    added += 1
+
+            self._empty_fetches = 0 if added else self._empty_fetches + 1
+            if self._empty_fetches >= MAX_EMPTY_FETCHES:
+                self._exhausted = AssertionError(
+                    f"No new images found after {MAX_EMPTY_FETCHES} searches ({len(self._seen)} images seen)")
+
+            self._refilling = False
+            if self._wants_more():
+                self._start_refill()
+            self._condition.notify_all()
+
+    def prefetch(self) -> None:
+        """Start filling the pool before the first image is needed"""
+        with self._condition:
+            self._start_refill()
+
+    def take(self, needed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Take an image that has not been handed out before
+        Args:
+            needed: Images the caller still needs, counting this one, so the pool stops
+                    refilling once it holds enough (default: keep refilling)
+        Returns:
+            Dict containing image data including 'id' and 'url' keys
+        """
+        with self._condition:
+            while not self._images:
+                if self._error is not None:
+                    # Report a failed refill once; the next take() tries again
+                    error, self._error = self._error, None
+                    raise error
+                if self._exhausted is not None:
+                    raise self._exhausted
+                self._start_refill()
+                self._condition.wait()
+
+            image = self._images.popleft()
+            self._still_needed = None if needed is None else needed - 1
+            if self._wants_more():
+                self._start_refill()
+            return image
+
+    def take_many(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Take several unique images
+        Args:
+            count: Number of images to take
+        Returns:
+            List of image data dictionaries
+        """
+        return [self.take(count - i) for i in range(count)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of search calls, images seen and images ready to hand out"""
+        with self._condition:
+            return {
+                "fetches": self.fetches,
+                "images_seen": len(self._seen),
+                "available": len(self._images)
+            }
@@ -0,0 +1,102 @@
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional: several times faster than the stdlib on large vote listings
+    orjson = None
+
+
+class StdlibJsonCodec:
+    """JSON codec backed by the standard library"""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, compact: bool = True) -> bytes:
+        if compact:
+            return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+
+class OrjsonCodec:
+    """JSON codec backed by orjson"""
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any, compact: bool = True) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS  # Accept the same dict keys as the stdlib
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+
+def _default_codec():
+    """Pick orjson when installed, unless CAT_API_JSON=json asks for the stdlib"""
+    if orjson is not None and os.environ.get("CAT_API_JSON", "orjson") != "json":
+        return OrjsonCodec()
+    return StdlibJsonCodec()
+
+
+_codec = _default_codec()
+
+
+def get_codec():
+    """Return the codec used for request bodies, responses and result files"""
+    return _codec
+
+
+def set_codec(codec) -> None:
+    """
+    Replace the codec
+    Args:
+        codec: Object with loads(data) and dumps(obj, compact) methods, e.g. StdlibJsonCodec()
+    """
+    global _codec
+    _codec = codec
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON
+    Args:
+        data: JSON document as bytes (preferred, skips a decode step) or text
+    Returns:
+        The decoded value
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    return _codec.loads(data)
+
+
+def dumps(obj: Any, compact: bool = True) -> bytes:
+    """
+    Encode a value as UTF-8 JSON
+    Args:
+        obj: Value to encode
+        compact: Whether to leave out whitespace (for machine-consumed output) or indent by 2
+    Returns:
+        The encoded document
+    """
+    return _codec.dumps(obj, compact)
+
+
+def dump_to_file(obj: Any, filename: str, compact: bool = True) -> str:
+    """
+    Write a value to a JSON file
+    Args:
+        obj: Value to encode
+        filename: File to write
+        compact: Whether to leave out whitespace or indent by 2
+    Returns:
+        The file name
+    """
+    with open(filename, "wb") as f:
+        f.write(dumps(obj, compact))
+    return filename
@@ -11,12 +11,24 @@ Usage:
 
 import os
 import argparse
-from typing import Dict, List, Any, Optional
+import contextvars
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 
 from C6_Analysis.S19_Refactor_Builder.Result.builder import VoteGeneratorBuilder
 from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result.client_pool import CatApiClientPool
+from C6_Analysis.S19_Refactor_Builder.Result.connection_pool import DEFAULT_POOL_MAXSIZE
+from C6_Analysis.S19_Refactor_Builder.Result.image_pool import ImagePool, DEFAULT_BATCH_SIZE, DEFAULT_IMAGE_WORKERS
+from C6_Analysis.S19_Refactor_Builder.Result.response_cache import DEFAULT_TTL
+from C6_Analysis.S19_Refactor_Builder.Result.run_journal import RunJournal
+from C6_Analysis.S19_Refactor_Builder.Result.tracing import tracer, traced, FORMATS, CHROME
+from C6_Analysis.S19_Refactor_Builder.Result.streaming_result import StreamingVoteGenerationResult
 from C6_Analysis.S19_Refactor_Builder.Result.vote_generation_result import VoteGenerationResult
 
+VOTE_WINDOW_FACTOR = 2  # Votes queued or in flight per worker
+
 
 class VoteGenerator:
     """Generates votes for cat images based on configured strategies"""
@@ -28,7 +40,12 @@ class VoteGenerator:
                  specific_image_ids: List[str],
                  verify_votes: bool,
                  save_results: bool,
-                 result_filename: Optional[str]):
+                 result_filename: Optional[str],
+                 concurrency: int = 1,
+                 ordered_results: bool = True,
+                 image_workers: int = DEFAULT_IMAGE_WORKERS,
+                 stream_results: bool = False,
+                 journal: Optional[RunJournal] = None):
         """
         Initialize the vote generator
         Args:
@@ -41,6 +58,11 @@ class VoteGenerator:
             verify_votes: Whether to verify votes after creating them
             save_results: Whether to save results to a file
             result_filename: Name of the file to save results to
+            concurrency: Number of votes cast at once
+            ordered_results: Whether votes are recorded in plan order rather than as they finish
+            image_workers: Number of specific images fetched at once
+            stream_results: Whether to append records to a JSONL file as they happen
+            journal: Journal to checkpoint the run to; a journal of an earlier run resumes it
         """
         self.api_client = api_client
         self.num_votes = num_votes
@@ -51,142 +73,315 @@ class VoteGenerator:
         self.verify_votes = verify_votes
         self.save_results = save_results
         self.result_filename = result_filename
+        self.concurrency = concurrency
+        self.ordered_results = ordered_results
+        self.image_workers = image_workers
+        self.stream_results = stream_results
+        self.journal = journal
+
+    def _random_image_pool(self, count: int) -> ImagePool:
+        """Create a pool for random images and start searching for them in the background"""
+        pool = ImagePool(self.api_client, batch_size=min(count, DEFAULT_BATCH_SIZE))
+        pool.prefetch()
+        return pool
+
+    def _iter_images(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the images to use for voting, in distribution order, as soon as each is resolved
+        Specific images are fetched up to image_workers at a time and random ones are searched
+        for in the background, so voting on the first images overlaps loading the rest.
+        """
+        resumed_images = self.journal.images if self.journal else []
+        exclude = {image["id"] for image in resumed_images}
+        required_images = len(self.image_distribution) - len(resumed_images)
+        specific_ids = [img_id for img_id in self.specific_image_ids if img_id not in exclude][:required_images]
+        exclude.update(specific_ids)
+        missing = required_images - len(specific_ids)
+        pool = self._random_image_pool(missing) if missing > 0 else None
 
-    def _get_images(self) -> List[Dict[str, Any]]:
-        """Get images to use for voting"""
-        required_images = len(self.image_distribution)
+        # Images a resumed run already voted on come first, without fetching them again
+        yield from resumed_images
 
         # If specific images were provided, use them
-        if self.specific_image_ids:
-            images = []
-            for img_id in self.specific_image_ids[:required_images]:
+        with ThreadPoolExecutor(max_workers=self.image_workers, thread_name_prefix="image") as executor:
+            # Each fetch runs in a copy of this context so its spans nest under the caller
+            futures = [executor.submit(contextvars.copy_context().run, self.api_client.get_image, img_id)
+                       for img_id in specific_ids]
+            for img_id, future in zip(specific_ids, futures):
                 try:
-                    image = self.api_client.get_image(img_id)
-                    images.append(image)
+                    yield future.result()
                 except Exception as e:
                     print(f"Error fetching image {img_id}: {str(e)}")
-
-            # If we don't have enough images, fetch random ones
-            while len(images) < required_images:
-                images.append(self.api_client.find_random_image())
-
-            return images
-
-        # Otherwise, fetch random images
-        images = []
-        for _ in range(required_images):
-            images.append(self.api_client.find_random_image())
-
-        return images
-
-    def _calculate_votes_per_image(self, images: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Calculate how many votes each image should get"""
-        votes_per_image = {}
+                    missing += 1
+
+        # If we don't have enough images, fetch random ones
+        if missing > 0:
+            pool = pool or self._random_image_pool(missing)
+            while missing:
+                image = pool.take(missing)
+                if image["id"] not in exclude:
+                    missing -= 1
+                    yield image
+
+    def _calculate_vote_counts(self, num_images: int) -> List[int]:
+        """Calculate how many votes each image should get, in distribution order"""
+        vote_counts = []
         remaining_votes = self.num_votes
 
-        # Match distribution keys to actual images
-        distribution_keys = list(self.image_distribution.keys())
-        for i, image in enumerate(images):
-            if i < len(distribution_keys):
-                key = distribution_keys[i]
-                votes = int(self.num_votes * self.image_distribution[key])
-                votes_per_image[image["id"]] = votes
-                remaining_votes -= votes
+        # Match distribution weights to image slots
+        for weight in list(self.image_distribution.values())[:num_images]:
+            votes = int(self.num_votes * weight)
+            vote_counts.append(votes)
+            remaining_votes -= votes
 
         # Distribute any remaining votes due to rounding
-        for image_id in votes_per_image.keys():
+        for i in range(len(vote_counts)):
             if remaining_votes > 0:
-                votes_per_image[image_id] += 1
+                vote_counts[i] += 1
                 remaining_votes -= 1
             elif remaining_votes < 0:
-                votes_per_image[image_id] = max(0, votes_per_image[image_id] - 1)
+                vote_counts[i] = max(0, vote_counts[i] - 1)
                 remaining_votes += 1
 
             if remaining_votes == 0:
                 break
 
-        return votes_per_image
+        return vote_counts
+
+    def _plan_votes(self, images: Iterable[Dict[str, Any]],
+                    vote_counts: List[int]) -> Iterator[Tuple[str, str, int]]:
+        """Decide the image, sub_id and value of each vote in order, so workers never call the strategies"""
+        resumed_plan = list(self.journal.planned) if self.journal else []
+        index = 0
+        for image, count in zip(images, vote_counts):
+            for _ in range(count):
+                if index < len(resumed_plan):
+                    # A resumed run reuses the sub_ids and values it planned before, stepping the
+                    # strategies past them so the votes planned from here on continue their sequence
+                    assert resumed_plan[index][0] == image["id"], f"Run file plan doesn't match image {image['id']}"
+                    self.user_id_strategy()
+                    self.vote_value_strategy()
+                    yield resumed_plan[index]
+                else:
+                    # Generate a unique sub_id and determine the vote value
+                    planned = image["id"], self.user_id_strategy(), self.vote_value_strategy()
+                    if self.journal:
+                        self.journal.plan(index, *planned)
+                    yield planned
+                index += 1
+
+    def _cast_vote(self, index: int, image_id: str, sub_id: str, value: int) -> Dict[str, Any]:
+        """Add one vote, journaling it once accepted, and return its record or the error it raised"""
+        vote = {"image_id": image_id, "sub_id": sub_id, "value": value}
+        try:
+            vote_result = self.api_client.add_vote(image_id, sub_id, value)
+        except Exception as e:
+            return {"vote": vote, "error": str(e)}
+
+        vote["id"] = vote_result.get("id")
+        if self.journal:
+            self.journal.complete(index, vote)
+        return {"vote": vote}
+
+    @traced()
+    def _cast_votes(self, plan: Iterable[Tuple[str, str, int]],
+                    result: VoteGenerationResult) -> Dict[str, List[Any]]:
+        """
+        Cast the planned votes as they are planned, on a pool of workers when concurrency is above 1
+        Args:
+            plan: (image_id, sub_id, value) of each vote
+            result: Result to record the votes and errors in
+        Returns:
+            IDs of the votes created, keyed by image ID, when votes are verified
+        """
+        votes_created = 0
+        created = defaultdict(list)
+        # Votes a resumed run cast before it was interrupted are recorded without casting them again
+        completed = dict(self.journal.completed) if self.journal else {}
+
+        def record(index: int, outcome: Dict[str, Any]) -> None:
+            nonlocal votes_created
+            vote = outcome["vote"]
+            if "error" in outcome:
+                print(f"Error creating vote {index + 1}: {outcome['error']}")
+                result.add_error(outcome["error"], dict(vote, vote_index=index))
+                return
+            votes_created += 1
+            if self.verify_votes:
+                # Only kept for verification, so unverified streaming runs use flat memory
+                created[vote["image_id"]].append(vote["id"])
+            print(f"Vote {votes_created}/{self.num_votes} created: ID {vote['id']}")
+            result.add_vote({
+                "id": vote["id"],
+                "image_id": vote["image_id"],
+                "sub_id": vote["sub_id"],
+                "value": vote["value"]
+            })
+
+        if self.concurrency == 1:
+            for index, planned in enumerate(plan):
+                record(index, {"vote": completed[index]} if index in completed else self._cast_vote(index, *planned))
+            return created
+
+        def submit(index: int, planned: Tuple[str, str, int]) -> Future:
+            if index in completed:
+                future = Future()
+                future.set_result({"vote": completed[index]})
+                return future
+            # Each vote runs in a copy of this context so its spans nest under _cast_votes
+            return executor.submit(contextvars.copy_context().run, self._cast_vote, index, *planned)
+
+        # Votes queued or in flight, oldest first; bounded so an interrupt leaves little to cancel
+        pending: Dict[Future, int] = {}
+        window = VOTE_WINDOW_FACTOR * self.concurrency
+
+        def record_next() -> None:
+            done = [next(iter(pending))] if self.ordered_results \
+                else wait(pending, return_when=FIRST_COMPLETED).done
+            for future in done:
+                record(pending.pop(future), future.result())
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="vote")
+        try:
+            # Votes are submitted as their image resolves, so workers start before all images are loaded
+            for index, planned in enumerate(plan):
+                if len(pending) >= window:
+                    record_next()
+                pending[submit(index, planned)] = index
+            while pending:
+                record_next()
+        except BaseException:
+            # Don't cast queued votes after an error or Ctrl+C, but let the few running ones finish
+            # so every vote the API accepted is journaled
+            executor.shutdown(cancel_futures=True)
+            raise
+        executor.shutdown()
+        return created
+
+    @traced()
+    def _verify_votes(self, images: List[Dict[str, Any]], created: Dict[str, List[Any]],
+                      result: VoteGenerationResult) -> None:
+        """
+        Count the recorded votes for every image in one pass over the account's votes,
+        then reconcile them with the votes cast and record any discrepancies
+        Args:
+            images: Images voted on
+            created: IDs of the votes created, keyed by image ID
+            result: Result to store the counts and discrepancies in
+        """
+        print("\n=== Verifying votes ===")
+        image_ids = {image["id"] for image in images}
+        recorded = Counter()
+        found = Counter()
+        unseen = {vote_id: image_id for image_id, vote_ids in created.items() for vote_id in vote_ids}
+
+        # One streamed scan of the account instead of a full listing per image
+        for vote in self.api_client.iter_votes():
+            image_id = vote.get("image_id")
+            if image_id not in image_ids:
+                continue
+            recorded[image_id] += 1
+            if unseen.pop(vote.get("id"), None) is not None:
+                found[image_id] += 1
 
+        for image in images:
+            image_id = image["id"]
+            expected = len(created.get(image_id, []))
+            print(f"Image {image_id}: {recorded[image_id]} votes recorded, {found[image_id]}/{expected} from this run")
+            result.update_image_vote_count(image_id, recorded[image_id])
+
+            if found[image_id] != expected:
+                result.add_discrepancy({
+                    "image_id": image_id,
+                    "expected": expected,
+                    "found": found[image_id],
+                    "recorded": recorded[image_id],
+                    "missing_vote_ids": [vote_id for vote_id, owner in unseen.items() if owner == image_id]
+                })
+
+        if result.discrepancies:
+            print(f"Warning: {len(unseen)} votes missing across {len(result.discrepancies)} images")
+
+    @traced()
     def generate(self) -> VoteGenerationResult:
-        """Generate votes according to the configured strategies"""
-        result = VoteGenerationResult()
+        """Generate votes according to the configured strategies, resuming the journaled run if there is one"""
+        if self.journal and self.journal.resumed:
+            # Carry on with the resumed run's vote count and distribution, whatever was configured now
+            self.num_votes = self.journal.num_votes
+            self.image_distribution = self.journal.image_distribution
+            print(f"Resuming run from {self.journal.filename}: {len(self.journal.completed)}/{self.num_votes} "
+                  f"votes already cast on {len(self.journal.images)} images")
+        elif self.journal:
+            self.journal.start(self.num_votes, self.image_distribution)
+
+        if self.stream_results:
+            # A resumed run adds to the results file of the run it continues
+            result = StreamingVoteGenerationResult(self.result_filename,
+                                                   append=bool(self.journal and self.journal.resumed))
+            print(f"Streaming results to {result.filename}")
+        else:
+            result = VoteGenerationResult()
+
+        try:
+            self._generate(result)
+        except BaseException:
+            # Keep everything recorded so far on disk when a streaming run is interrupted
+            if self.stream_results:
+                result.close()
+            raise
+        finally:
+            if self.journal:
+                self.journal.close()
+
+        print("\n" + self.api_client.metrics.to_text())
 
-        print(f"\n=== Generating {self.num_votes} votes ===")
+        # Save results to file if requested
+        if self.save_results:
+            filename = result.save_to_file(self.result_filename)
+            print(f"\nResults saved to {filename}")
 
-        # Get images
-        images = self._get_images()
-        for image in images:
-            result.add_image(image)
+        return result
 
-        print(f"Using {len(images)} images for voting")
+    def _generate(self, result: VoteGenerationResult) -> None:
+        """Resolve images, cast the votes and verify them, recording everything in the result"""
+        print(f"\n=== Generating {self.num_votes} votes ===")
 
         # Calculate votes per image
-        votes_per_image = self._calculate_votes_per_image(images)
-
-        # Generate votes
-        votes_created = 0
-        for image in images:
-            image_id = image["id"]
-            votes_for_this_image = votes_per_image.get(image_id, 0)
-
-            for _ in range(votes_for_this_image):
-                # Generate a unique sub_id
-                sub_id = self.user_id_strategy()
-
-                # Determine vote value
-                value = self.vote_value_strategy()
+        vote_counts = self._calculate_vote_counts(len(self.image_distribution))
 
-                # Add the vote
-                try:
-                    vote_result = self.api_client.add_vote(image_id, sub_id, value)
-                    print(f"Vote {votes_created + 1}/{self.num_votes} created: ID {vote_result.get('id')}")
-
-                    # Add to results
-                    result.add_vote({
-                        "id": vote_result.get("id"),
-                        "image_id": image_id,
-                        "sub_id": sub_id,
-                        "value": value
-                    })
+        # Get images, recording each as it is resolved
+        images = []
 
-                    votes_created += 1
+        def resolved_images() -> Iterator[Dict[str, Any]]:
+            for image in self._iter_images():
+                images.append(image)
+                result.add_image(image)
+                if self.journal:
+                    self.journal.add_image(image)
+                yield image
 
-                except Exception as e:
-                    error_message = str(e)
-                    print(f"Error creating vote: {error_message}")
-                    result.add_error(error_message)
+        # Generate votes, starting on each image while the rest are still loading
+        created = self._cast_votes(self._plan_votes(resolved_images(), vote_counts), result)
+        print(f"Used {len(images)} images for voting")
 
         # Verify the votes
         if self.verify_votes:
-            print("\n=== Verifying votes ===")
-            for image in images:
-                image_id = image["id"]
-                votes = self.api_client.get_votes_for_image(image_id)
-                print(f"Image {image_id}: {len(votes)} votes recorded")
-
-                # Update results
-                result.update_image_vote_count(image_id, len(votes))
+            self._verify_votes(images, created, result)
 
         # Finalize Result
         result.finalize()
 
-        # Save results to file if requested
-        if self.save_results:
-            filename = result.save_to_file(self.result_filename)
-            print(f"\nResults saved to {filename}")
-
-        return result
-
 
 def main():
     """Main function to parse arguments and run the vote generator"""
     parser = argparse.ArgumentParser(description="Generate votes for the Cat API")
 
-    parser.add_argument("--votes", type=int, required=True,
-                        help="Number of votes to generate")
+    parser.add_argument("--votes", type=int, default=None,
+                        help="Number of votes to generate (required unless resuming)")
 
-    parser.add_argument("--api-key", type=str, default=os.environ.get("CAT_API_KEY"),
-                        help="Your Cat API key (can also set CAT_API_KEY env var)")
+    parser.add_argument("--api-key", type=str, action="append", default=None,
+                        help="Your Cat API key, repeat to spread votes over several keys "
+                             "(can also set CAT_API_KEY env var, comma-separated)")
 
     parser.add_argument("--image-strategy", type=str, choices=["single", "multiple", "primary"],
                         default="single", help="Image distribution strategy")
@@ -223,26 +418,83 @@ def main():
     parser.add_argument("--output-file", type=str, default=None,
                         help="Name of the file to save results to")
 
+    run_file_group = parser.add_mutually_exclusive_group()
+    run_file_group.add_argument("--run-file", type=str, default=None,
+                                help="Journal the planned and completed votes to this file so the run can be resumed")
+    run_file_group.add_argument("--resume", type=str, default=None, metavar="RUN_FILE",
+                                help="Resume the run journaled to this file, skipping votes already cast")
+
+    parser.add_argument("--stream-results", action="store_true",
+                        help="Append votes, errors and images to a JSONL file as they happen")
+
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of votes cast at once")
+
+    parser.add_argument("--image-workers", type=int, default=DEFAULT_IMAGE_WORKERS,
+                        help="Number of specific images fetched at once")
+
+    parser.add_argument("--image-cache", type=int, default=0, metavar="SIZE",
+                        help="Cache up to this many fetched images by ID (default: no caching)")
+
+    parser.add_argument("--image-cache-ttl", type=float, default=DEFAULT_TTL, metavar="SECONDS",
+                        help="Seconds a cached image stays valid (with --image-cache)")
+
+    parser.add_argument("--unordered", action="store_true",
+                        help="Record votes as they finish instead of in plan order (with --workers)")
+
+    parser.add_argument("--metrics-file", type=str, default=None,
+                        help="Save API metrics to this file (JSON if it ends in .json, text otherwise)")
+
+    parser.add_argument("--trace-file", type=str, default=None,
+                        help="Record a trace of every API call and save it to this file")
+
+    parser.add_argument("--trace-format", type=str, choices=FORMATS, default=CHROME,
+                        help="Trace file format: Chrome trace events or OTLP/JSON")
+
     args = parser.parse_args()
 
     # Validate required arguments
-    if not args.api_key:
+    api_keys = args.api_key or [key for key in os.environ.get("CAT_API_KEY", "").split(",") if key]
+    if not api_keys:
         parser.error("API key is required. Provide it with --api-key or set CAT_API_KEY env var")
 
-    if args.votes < 1:
+    if args.votes is None and not args.resume:
+        parser.error("Number of votes is required unless resuming a run")
+
+    if args.votes is not None and args.votes < 1:
         parser.error("Number of votes must be at least 1")
 
+    if args.resume and not os.path.exists(args.resume):
+        parser.error(f"Run file {args.resume} does not exist")
+
+    if args.workers < 1:
+        parser.error("Number of workers must be at least 1")
+
+    if args.image_workers < 1:
+        parser.error("Number of image workers must be at least 1")
+
+    if args.image_cache < 0:
+        parser.error("Image cache size cannot be negative")
+
+    if args.image_cache_ttl <= 0:
+        parser.error("Image cache TTL must be positive")
+
     if args.user_id_strategy == "fixed" and not args.fixed_user_id:
         parser.error("--fixed-user-id is required when --user-id-strategy=fixed")
 
-    # Initialize the client
-    api_client = CatApiClient(args.api_key)
+    # Initialize the client, pooling the keys if there are several; keep a connection per worker
+    pool_maxsize = max(DEFAULT_POOL_MAXSIZE, args.workers + args.image_workers)
+    if len(api_keys) == 1:
+        api_client = CatApiClient(api_keys[0], pool_maxsize=pool_maxsize)
+    else:
+        api_client = CatApiClientPool(api_keys, pool_maxsize=pool_maxsize)
 
     # Create the generator builder
     builder = VoteGeneratorBuilder(api_client)
 
     # Configure vote count
-    builder.with_vote_count(args.votes)
+    if args.votes is not None:
+        builder.with_vote_count(args.votes)
 
     # Configure image distribution
     if args.image_strategy == "single":
@@ -274,25 +526,44 @@ def main():
     elif args.user_id_strategy == "fixed":
         builder.with_fixed_user_id(args.fixed_user_id)
 
+    # Configure parallel voting
+    builder.with_concurrency(args.workers, ordered=not args.unordered)
+    builder.with_image_workers(args.image_workers)
+    if args.image_cache:
+        builder.with_image_cache(args.image_cache, args.image_cache_ttl)
+
     # Configure verification and Result saving
     builder.with_verification(not args.no_verify)
     builder.with_result_saving(not args.no_save, args.output_file)
+    builder.with_streaming_results(args.stream_results)
+
+    # Configure checkpointing, resuming the run if asked to
+    if args.run_file or args.resume:
+        builder.with_run_file(args.run_file or args.resume)
 
     # Build and run the generator
+    if args.trace_file:
+        tracer.start()
     generator = builder.build()
     result = generator.generate()
 
     # Print summary
     print("\n=== Summary ===")
-    print(f"Total votes created: {len(result.votes)}")
+    print(f"Total votes created: {result.total_votes}")
     print(f"Using {len(result.images)} images")
 
     for img in result.images:
         verified_count = img.get("verified_vote_count", "unknown")
         print(f"Image {img['id']}: {verified_count} verified votes")
 
-    if result.errors:
-        print(f"\nErrors encountered: {len(result.errors)}")
+    if result.error_count:
+        print(f"\nErrors encountered: {result.error_count}")
+
+    if args.metrics_file:
+        print(f"API metrics saved to {api_client.metrics.save_to_file(args.metrics_file)}")
+
+    if args.trace_file:
+        print(f"Trace saved to {tracer.save_to_file(args.trace_file, args.trace_format)}")
 
     print("\nDone!")
 
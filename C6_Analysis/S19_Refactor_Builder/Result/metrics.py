@@ -0,0 +1,176 @@
+import threading
+import time
+from typing import Dict, Any, Optional, Union
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+
+SIGNIFICANT_BITS = 5  # Histogram buckets keep the top 5 bits of a value, about 3% relative error
+PERCENTILES = [50.0, 90.0, 99.0, 99.9]
+
+
+class LatencyHistogram:
+    """HDR-style histogram of latencies with log-linear buckets in microseconds"""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    @staticmethod
+    def _bucket(value_us: int) -> int:
+        """Lower bound of the bucket a value falls into"""
+        shift = max(0, value_us.bit_length() - SIGNIFICANT_BITS)
+        return (value_us >> shift) << shift
+
+    def record(self, seconds: float) -> None:
+        """Record one latency"""
+        value_us = max(0, int(seconds * 1_000_000))
+        bucket = self._bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Get a latency percentile
+        Args:
+            percent: Percentile between 0 and 100
+        Returns:
+            Latency in milliseconds, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        target = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return round(min(bucket, self.max_us) / 1000.0, 3)
+        return round(self.max_us / 1000.0, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram in milliseconds"""
+        summary = {
+            "count": self.count,
+            "min_ms": round(self.min_us / 1000.0, 3) if self.count else None,
+            "mean_ms": round(self.total_us / self.count / 1000.0, 3) if self.count else None,
+            "max_ms": round(self.max_us / 1000.0, 3) if self.count else None
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}_ms"] = self.percentile(percent)
+        return summary
+
+
+class EndpointMetrics:
+    """Counters and latency histograms for one endpoint"""
+
+    def __init__(self):
+        self.latency_by_status: Dict[str, LatencyHistogram] = {}
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.retries = 0
+        self.rate_limit_wait_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the endpoint's metrics"""
+        return {
+            "requests": sum(h.count for h in self.latency_by_status.values()),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "retries": self.retries,
+            "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 4),
+            "latency": {status: h.to_dict() for status, h in sorted(self.latency_by_status.items())}
+        }
+
+
+class ClientMetrics:
+    """Per-endpoint request metrics for a Cat API client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all metrics"""
+        with self._lock:
+            self._endpoints: Dict[str, EndpointMetrics] = {}
+            self.pool_wait = LatencyHistogram()
+            self.started = time.time()
+
+    def _endpoint(self, endpoint: str) -> EndpointMetrics:
+        """Get (or create) the metrics for an endpoint (caller holds the lock)"""
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = EndpointMetrics()
+        return self._endpoints[endpoint]
+
+    def record_request(self, endpoint: str, status: Union[int, str], seconds: float,
+                       bytes_out: int = 0, bytes_in: int = 0) -> None:
+        """
+        Record one request attempt
+        Args:
+            endpoint: Endpoint key, e.g. "POST /votes"
+            status: HTTP status code, or an error name if no response was received
+            seconds: Time from sending the request to receiving the response
+            bytes_out: Size of the request body
+            bytes_in: Size of the response body
+        """
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            histogram = metrics.latency_by_status.setdefault(str(status), LatencyHistogram())
+            histogram.record(seconds)
+            metrics.bytes_out += bytes_out
+            metrics.bytes_in += bytes_in
+
+    def record_retry(self, endpoint: str) -> None:
+        """Record that a request to the endpoint is being resent"""
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+
+    def record_rate_limit_wait(self, endpoint: str, seconds: float) -> None:
+        """Record time spent waiting for the rate limiter"""
+        with self._lock:
+            self._endpoint(endpoint).rate_limit_wait_seconds += seconds
+
+    def record_pool_wait(self, seconds: float) -> None:
+        """Record time spent waiting for a pooled connection"""
+        with self._lock:
+            self.pool_wait.record(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a dictionary"""
+        with self._lock:
+            return {
+                "duration_seconds": round(time.time() - self.started, 2),
+                "endpoints": {name: m.to_dict() for name, m in sorted(self._endpoints.items())},
+                "pool_wait": self.pool_wait.to_dict()
+            }
+
+    def to_json(self) -> str:
+        """Dump the metrics as JSON"""
+        return json_codec.dumps(self.snapshot(), compact=False).decode("utf-8")
+
+    def to_text(self) -> str:
+        """Dump the metrics as a human-readable table"""
+        snapshot = self.snapshot()
+        lines = [f"=== API metrics ({snapshot['duration_seconds']}s) ==="]
+        for name, endpoint in snapshot["endpoints"].items():
+            lines.append(f"{name}: {endpoint['requests']} requests, {endpoint['retries']} retries, "
+                         f"{endpoint['bytes_out']} B out, {endpoint['bytes_in']} B in, "
+                         f"{endpoint['rate_limit_wait_seconds']}s rate limited")
+            for status, latency in endpoint["latency"].items():
+                lines.append(f"  {status}: n={latency['count']} p50={latency['p50_ms']}ms "
+                             f"p90={latency['p90_ms']}ms p99={latency['p99_ms']}ms max={latency['max_ms']}ms")
+        pool_wait = snapshot["pool_wait"]
+        lines.append(f"Connection pool waits: n={pool_wait['count']} p99={pool_wait['p99_ms']}ms "
+                     f"max={pool_wait['max_ms']}ms")
+        return "\n".join(lines)
+
+    def save_to_file(self, filename: str) -> str:
+        """Save the metrics to a file, as JSON if the name ends in .json and as text otherwise"""
+        with open(filename, "w") as f:
+            f.write(self.to_json() if filename.endswith(".json") else self.to_text())
+        return filename
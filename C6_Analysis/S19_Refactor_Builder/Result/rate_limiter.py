@@ -0,0 +1,245 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+
+DEFAULT_RATE = 10.0  # Requests per second allowed per key until the API says otherwise
+DEFAULT_BURST = 10  # Requests that may be sent back to back before the rate applies
+EPOCH_THRESHOLD = 1_000_000_000  # Reset headers above this are absolute timestamps, not deltas
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Parse an X-RateLimit-Reset header
+    Args:
+        value: Header value, either seconds until reset or an epoch timestamp
+    Returns:
+        Seconds until the quota window resets, or None if missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > EPOCH_THRESHOLD:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+class TokenBucket:
+    """Token bucket that refills continuously and can be paused by the server"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: int = DEFAULT_BURST):
+        """
+        Initialize the bucket
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens the bucket holds
+        """
+        assert rate > 0, "Rate must be positive"
+        assert capacity > 0, "Capacity must be positive"
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting only if the budget is exhausted
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def available(self) -> float:
+        """
+        Get the budget left right now
+        Returns:
+            Tokens available, negative while paused or in debt so busier buckets rank lower
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return self.tokens - max(0.0, self.paused_until - now) * self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def adapt(self, limit: Optional[int], remaining: Optional[int], reset: Optional[float]) -> None:
+        """
+        Align the bucket with the quota reported by the server
+        Args:
+            limit: Requests allowed per window
+            remaining: Requests left in the current window
+            reset: Seconds until the window resets
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit:
+                self.capacity = limit
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if reset:
+                    # Spread the remaining budget over what is left of the window
+                    self.rate = max(remaining, 1) / reset
+        if remaining == 0 and reset:
+            self.pause(reset)
+
+
+class RateLimiter:
+    """
+    Rate limiting driven by token buckets and server feedback. The X-RateLimit-* quota belongs
+    to the API key, so every endpoint draws from one key-level bucket; endpoints can have
+    their own caps on top of it.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 endpoint_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        """
+        Initialize the rate limiter
+        Args:
+            rate: Requests per second allowed for the key across all endpoints
+            burst: Burst size for the key across all endpoints
+            endpoint_limits: Optional (rate, burst) caps keyed by endpoint, e.g. "POST /votes"
+        """
+        self.rate = rate
+        self.burst = burst
+        self.endpoint_limits = endpoint_limits or {}
+        self.key_bucket = TokenBucket(rate, burst)
+        self._caps: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.wait_seconds = 0.0
+        self.throttled_responses = 0
+
+    def endpoint_cap(self, endpoint: str) -> Optional[TokenBucket]:
+        """Get (or create) the cap for an endpoint, or None if it only shares the key's budget"""
+        if endpoint not in self.endpoint_limits:
+            return None
+        with self._lock:
+            if endpoint not in self._caps:
+                self._caps[endpoint] = TokenBucket(*self.endpoint_limits[endpoint])
+            return self._caps[endpoint]
+
+    def acquire(self, endpoint: str) -> float:
+        """
+        Wait until a request to the endpoint is allowed
+        Args:
+            endpoint: Endpoint key, e.g. "GET /votes"
+        Returns:
+            Seconds spent waiting
+        """
+        cap = self.endpoint_cap(endpoint)
+        waited = cap.acquire() if cap is not None else 0.0
+        waited += self.key_bucket.acquire()
+        if waited:
+            with self._lock:
+                self.wait_seconds += waited
+        return waited
+
+    def budget(self, endpoint: str) -> float:
+        """
+        Get the budget left for an endpoint without taking any of it
+        Args:
+            endpoint: Endpoint key, e.g. "POST /votes"
+        Returns:
+            Requests that could be sent right now without waiting
+        """
+        cap = self.endpoint_cap(endpoint)
+        budget = self.key_bucket.available()
+        return min(budget, cap.available()) if cap is not None else budget
+
+    def observe(self, endpoint: str, response: requests.Response) -> Optional[float]:
+        """
+        Adapt the key's budget to rate limit headers on a response
+        Args:
+            endpoint: Endpoint key the request was sent to
+            response: Response received from the API
+        Returns:
+            Seconds to wait before retrying if the request was throttled, otherwise None
+        """
+        headers = response.headers
+
+        def header_int(name: str) -> Optional[int]:
+            try:
+                return int(headers[name])
+            except (KeyError, ValueError):
+                return None
+
+        self.key_bucket.adapt(
+            header_int("X-RateLimit-Limit"),
+            header_int("X-RateLimit-Remaining"),
+            parse_reset(headers.get("X-RateLimit-Reset"))
+        )
+
+        if response.status_code != 429:
+            return None
+
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None:
+            retry_after = 1.0 / self.key_bucket.rate
+        self.key_bucket.pause(retry_after)
+        with self._lock:
+            self.throttled_responses += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        """Return total wait time and throttled response count"""
+        with self._lock:
+            return {
+                "wait_seconds": round(self.wait_seconds, 4),
+                "throttled_responses": self.throttled_responses
+            }
+
+
+class NoRateLimit(RateLimiter):
+    """Rate limiter that never waits, for local servers and replayed traffic"""
+
+    def acquire(self, endpoint: str) -> float:
+        return 0.0
+
+    def observe(self, endpoint: str, response: requests.Response) -> Optional[float]:
+        if response.status_code == 429:
+            return parse_retry_after(response.headers.get("Retry-After")) or 0.0
+        return None
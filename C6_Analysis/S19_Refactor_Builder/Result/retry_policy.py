@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Set, Tuple
+
+DEFAULT_MAX_ATTEMPTS = 4  # Attempts per request, including the first one
+DEFAULT_BASE_DELAY = 0.1  # Smallest wait between attempts
+DEFAULT_MAX_DELAY = 5.0  # Largest wait between attempts
+DEFAULT_DEADLINE = 30.0  # Seconds after which a request is no longer retried
+DEFAULT_CONNECT_TIMEOUT = 3.05  # Seconds an attempt may take to connect
+DEFAULT_READ_TIMEOUT = 15.0  # Seconds an attempt may wait for the server between bytes
+MIN_ATTEMPT_TIMEOUT = 0.1  # Shortest timeout given to an attempt however little time is left
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Statuses where the server did not act on the request, so even a POST can safely be resent
+NOT_PROCESSED_STATUSES = {425, 429, 503}
+
+DEFAULT_FAILURE_THRESHOLD = 5  # Consecutive failures that open the circuit
+DEFAULT_RESET_TIMEOUT = 30.0  # Seconds the circuit stays open before a trial request
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the API is considered down"""
+
+
+class RetryPolicy:
+    """When and how long to wait before resending a failed request"""
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 deadline: Optional[float] = DEFAULT_DEADLINE,
+                 retry_statuses: Optional[Set[int]] = None,
+                 idempotent: bool = True,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT):
+        """
+        Initialize the retry policy
+        Args:
+            max_attempts: Attempts per request, including the first one
+            base_delay: Smallest wait between attempts in seconds
+            max_delay: Largest wait between attempts in seconds
+            deadline: Seconds after which no further attempt is started, or None for no deadline
+            retry_statuses: Response statuses that are retried (default: 408, 425, 429 and 5xx gateway errors)
+            idempotent: Whether resending is always safe; if False only statuses that guarantee
+                        the request was not processed, and connection failures, are retried
+            connect_timeout: Seconds an attempt may take to connect
+            read_timeout: Seconds an attempt may wait for the server between bytes
+        """
+        assert max_attempts > 0, "Attempt count must be positive"
+        assert 0 < base_delay <= max_delay, "Base delay must be positive and not above the max delay"
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = set(retry_statuses) if retry_statuses is not None else set(RETRYABLE_STATUSES)
+        self.idempotent = idempotent
+        assert connect_timeout > 0 and read_timeout > 0, "Timeouts must be positive"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """Whether a response with this status may be resent"""
+        if status_code not in self.retry_statuses:
+            return False
+        return self.idempotent or status_code in NOT_PROCESSED_STATUSES
+
+    def next_delay(self, previous_delay: Optional[float]) -> float:
+        """
+        Decorrelated jitter: wait a random time between the base delay and three times the last wait
+        Args:
+            previous_delay: The previous wait, or None before the first retry
+        Returns:
+            Seconds to wait before the next attempt
+        """
+        upper = (previous_delay or self.base_delay) * 3
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def attempt_timeout(self, started: float) -> Tuple[float, float]:
+        """
+        Timeouts for the next attempt, shortened so it can't run past the deadline
+        Args:
+            started: time.monotonic() when the first attempt started
+        Returns:
+            (connect, read) timeouts in seconds, as accepted by requests
+        """
+        if self.deadline is None:
+            return self.connect_timeout, self.read_timeout
+        left = max(MIN_ATTEMPT_TIMEOUT, self.deadline - (time.monotonic() - started))
+        return min(self.connect_timeout, left), min(self.read_timeout, left)
+
+    def can_retry(self, attempt: int, started: float, delay: float) -> bool:
+        """
+        Whether another attempt fits in the attempt budget and deadline
+        Args:
+            attempt: Number of attempts made so far
+            started: time.monotonic() when the first attempt started
+            delay: Wait planned before the next attempt
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if self.deadline is None:
+            return True
+        return time.monotonic() - started + delay < self.deadline
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures and lets a trial request through after a cool-down"""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Initialize the circuit breaker
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial request is allowed
+        """
+        assert failure_threshold > 0, "Failure threshold must be positive"
+        assert reset_timeout > 0, "Reset timeout must be positive"
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self, endpoint: str) -> None:
+        """
+        Check that a request may be sent
+        Args:
+            endpoint: Endpoint key, used in the error message
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(
+                f"Circuit open after {self.consecutive_failures} consecutive failures, "
+                f"not sending {endpoint} (next trial in {retry_in:.1f}s)")
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request"""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit once the threshold is reached"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the circuit state and counters"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
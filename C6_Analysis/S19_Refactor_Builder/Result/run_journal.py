@@ -0,0 +1,104 @@
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.streaming_result import read_records
+
+FORMAT_VERSION = 1
+
+RUN = "run"
+IMAGE = "image"
+PLAN = "plan"
+VOTE = "vote"
+
+
+class RunJournal:
+    """
+    Append-only journal of a vote generation run: its configuration, the images it resolved,
+    every vote it planned and every vote it completed. Reopening the file resumes the run.
+    A vote is journaled as soon as the API accepts it, so only votes still in flight when
+    the process dies can be cast twice.
+    """
+
+    def __init__(self, filename: str):
+        """
+        Open the journal, loading it if the file exists
+        Args:
+            filename: JSONL file the run is journaled to
+        """
+        self.filename = filename
+        self.num_votes: Optional[int] = None
+        self.image_distribution: Optional[Dict[str, float]] = None
+        self.images: List[Dict[str, Any]] = []
+        self.planned: List[Tuple[str, str, int]] = []
+        self.completed: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(filename):
+            self._load()
+        self._file = open(filename, "ab")
+
+    def _load(self) -> None:
+        for record in read_records(self.filename):
+            kind = record.pop("type")
+            if kind == RUN:
+                assert record["version"] == FORMAT_VERSION, f"Unsupported run file version {record['version']}"
+                self.num_votes = record["num_votes"]
+                self.image_distribution = record["image_distribution"]
+            elif kind == IMAGE:
+                self.images.append(record)
+            elif kind == PLAN:
+                assert record["index"] == len(self.planned), f"Run file {self.filename} has a gap in its plan"
+                self.planned.append((record["image_id"], record["sub_id"], record["value"]))
+            elif kind == VOTE:
+                self.completed[record.pop("index")] = record
+
+    @property
+    def resumed(self) -> bool:
+        """Whether the journal continues a run started earlier"""
+        return self.num_votes is not None
+
+    def _write(self, record: Dict[str, Any], flush: bool = False) -> None:
+        with self._lock:
+            self._file.write(json_codec.dumps(record) + b"\n")
+            if flush:
+                self._file.flush()
+
+    def start(self, num_votes: int, image_distribution: Dict[str, float]) -> None:
+        """Record the run's configuration, unless it is being resumed"""
+        if self.resumed:
+            return
+        self.num_votes = num_votes
+        self.image_distribution = dict(image_distribution)
+        self._write({"type": RUN, "version": FORMAT_VERSION, "num_votes": num_votes,
+                     "image_distribution": self.image_distribution}, flush=True)
+
+    def add_image(self, image: Dict[str, Any]) -> None:
+        """Record an image the run votes on, unless it already is"""
+        if any(known["id"] == image["id"] for known in self.images):
+            return
+        self.images.append(image)
+        self._write(dict(image, type=IMAGE))
+
+    def plan(self, index: int, image_id: str, sub_id: str, value: int) -> None:
+        """Record a planned vote before it is cast"""
+        self.planned.append((image_id, sub_id, value))
+        self._write({"type": PLAN, "index": index, "image_id": image_id, "sub_id": sub_id, "value": value})
+
+    def complete(self, index: int, vote: Dict[str, Any]) -> None:
+        """Record a vote the API accepted, flushing it to disk right away"""
+        with self._lock:
+            self.completed[index] = vote
+        self._write(dict(vote, type=VOTE, index=index), flush=True)
+
+    def close(self) -> None:
+        """Flush and close the journal"""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'RunJournal':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,70 @@
+import threading
+from typing import Dict, Any, Callable, Hashable
+
+
+class _Call:
+    """A request in flight and the callers waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one execution"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for the result of an identical call that is already running
+        Args:
+            key: Identifies identical calls, e.g. ("GET /votes", sub_id)
+            fn: The call to make if none is in flight for the key
+        Returns:
+            The result of fn, shared by every caller that joined the same flight
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.deduplicated += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later callers start a fresh request instead of reusing a finished one
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many calls were made, executed and deduplicated"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "deduplicated": self.deduplicated
+            }
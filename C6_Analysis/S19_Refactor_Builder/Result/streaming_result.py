@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional, Set
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.vote_generation_result import VoteGenerationResult
+
+FORMAT_VERSION = 1
+DEFAULT_FLUSH_EVERY = 100  # Records buffered before they are written to the file
+
+HEADER = "header"
+IMAGE = "image"
+VOTE = "vote"
+ERROR = "error"
+VERIFICATION = "verification"
+DISCREPANCY = "discrepancy"
+SUMMARY = "summary"
+
+
+def read_records(filename: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a JSONL result file
+    Args:
+        filename: File written by StreamingVoteGenerationResult
+    Yields:
+        Record dictionaries with a "type" key, skipping a final line cut short by a crash
+    """
+    with open(filename, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json_codec.loads(line)
+            except ValueError:
+                if line.endswith(b"\n"):
+                    raise
+                return
+
+
+def _drop_partial_line(filename: str) -> None:
+    """Cut a final line left incomplete by a crash, so appended records start on a line of their own"""
+    with open(filename, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            f.truncate(position)
+
+
+class StreamingVoteGenerationResult(VoteGenerationResult):
+    """
+    VoteGenerationResult that appends every image, vote and error to a JSONL file as it happens.
+    Votes and errors are not kept in memory, so memory stays flat however many votes are cast,
+    and everything flushed before an interruption survives it.
+    """
+
+    def __init__(self, filename: Optional[str] = None, flush_every: int = DEFAULT_FLUSH_EVERY,
+                 append: bool = False):
+        """
+        Initialize the result and open its file
+        Args:
+            filename: JSONL file to write records to (default: catapi_votes_<timestamp>.jsonl)
+            flush_every: Records buffered before they are written to the file
+            append: Whether to add to an existing file, for a resumed run, instead of starting it over
+        """
+        super().__init__()
+        assert flush_every > 0, "Flush batch size must be positive"
+        self.filename = filename or f"catapi_votes_{int(self.start_time)}.jsonl"
+        self.flush_every = flush_every
+        self._error_count = 0
+        self._recorded_vote_ids: Set[Any] = set()
+        self._buffer: List[bytes] = []
+        self._lock = threading.Lock()
+
+        is_new = not append or not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+        if not is_new:
+            _drop_partial_line(self.filename)
+            self._load_recorded()
+        self._file = open(self.filename, "wb" if is_new else "ab")
+        if is_new:
+            self._write({"type": HEADER, "version": FORMAT_VERSION, "timestamp": int(self.start_time)})
+
+    def _load_recorded(self) -> None:
+        """Pick up the images, votes and errors an earlier run already wrote to the file"""
+        for record in read_records(self.filename):
+            kind = record.pop("type")
+            if kind == IMAGE:
+                self.images.append(record)
+            elif kind == VOTE:
+                self._recorded_vote_ids.add(record.get("id"))
+                self.total_votes += 1
+            elif kind == ERROR:
+                self._error_count += 1
+
+    @property
+    def error_count(self) -> int:
+        """Number of errors recorded"""
+        return self._error_count
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._buffer.append(json_codec.dumps(record) + b"\n")
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Write the buffered records to the file (caller holds the lock)"""
+        if self._buffer and not self._file.closed:
+            self._file.write(b"".join(self._buffer))
+            self._file.flush()
+        self._buffer.clear()
+
+    def flush(self) -> None:
+        """Write the buffered records to the file now"""
+        with self._lock:
+            self._flush()
+
+    def add_image(self, image_data: Dict[str, Any]) -> None:
+        """Add an image to the results and the file, unless an earlier run already did"""
+        if any(image["id"] == image_data["id"] for image in self.images):
+            return
+        super().add_image(image_data)
+        self._write(dict(self.images[-1], type=IMAGE))
+
+    def add_vote(self, vote_data: Dict[str, Any]) -> None:
+        """Append a vote to the file, unless an earlier run already did"""
+        if vote_data.get("id") in self._recorded_vote_ids:
+            return
+        self.total_votes += 1
+        self._write(dict(vote_data, type=VOTE))
+
+    def add_error(self, error_message: str, context: Optional[Dict[str, Any]] = None) -> None:
+        """Append an error to the file, with optional details such as the vote it belongs to"""
+        self._error_count += 1
+        self._write(dict(context or {}, type=ERROR, timestamp=time.time(), message=error_message))
+
+    def update_image_vote_count(self, image_id: str, vote_count: int) -> None:
+        """Update the verified vote count for an image and append it to the file"""
+        super().update_image_vote_count(image_id, vote_count)
+        self._write({"type": VERIFICATION, "image_id": image_id, "verified_vote_count": vote_count})
+
+    def add_discrepancy(self, discrepancy: Dict[str, Any]) -> None:
+        """Add an image whose verified votes don't match the votes cast, and append it to the file"""
+        super().add_discrepancy(discrepancy)
+        self._write(dict(discrepancy, type=DISCREPANCY))
+
+    def finalize(self) -> None:
+        """Mark the generation as complete, write the summary footer and close the file"""
+        super().finalize()
+        self._write(dict(self.to_dict(), type=SUMMARY))
+        self.close()
+
+    def close(self) -> None:
+        """Flush any buffered records and close the file, without a summary if not finalized"""
+        with self._lock:
+            self._flush()
+            self._file.close()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the summary to a dictionary; votes and errors are only in the file"""
+        return {
+            "total_votes": self.total_votes,
+            "error_count": self.error_count,
+            "images": self.images,
+            "discrepancies": self.discrepancies,
+            "duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time else None,
+            "timestamp": int(self.start_time)
+        }
+
+    def save_to_file(self, filename: Optional[str] = None, compact: bool = False) -> str:
+        """Records are written as they happen, so just flush them and return the file they went to"""
+        self.flush()
+        return self.filename
+
+    def __enter__(self) -> 'StreamingVoteGenerationResult':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,437 @@
+import functools
+import hashlib
+import io
+import json
+import os
+import random
+import struct
+import threading
+import zlib
+from typing import Dict, Any, List, Optional, Iterator, BinaryIO, Tuple, Union, TYPE_CHECKING
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+
+if TYPE_CHECKING:
+    from C6_Analysis.S19_Refactor_Builder.Result.upload import UploadQueue
+
+JPEG = "jpeg"
+PNG = "png"
+FORMATS = [JPEG, PNG]
+EXTENSIONS = {JPEG: "jpg", PNG: "png"}
+
+TRUNCATED = "truncated"  # Cut off halfway through the image data
+BAD_MAGIC = "bad_magic"  # File signature overwritten, so it isn't recognised as an image
+CORRUPT = "corrupt"  # Bytes flipped inside the image data, and for JPEG a broken scan header and no end marker
+EMPTY = "empty"  # Zero-byte file
+WRONG_EXTENSION = "wrong_extension"  # Valid image named with the other format's extension
+DEFECTS = [TRUNCATED, BAD_MAGIC, CORRUPT, EMPTY, WRONG_EXTENSION]
+
+BLOCK = 8  # Pixels per side of each flat-coloured block in the generated pictures
+MAX_JPEG_DIMENSION = 65535
+JPEG_SEGMENT_PAYLOAD = 65533  # Largest comment segment payload
+PNG_CHUNK_OVERHEAD = 12  # Length, type and CRC around every PNG chunk
+PNG_IDAT_SIZE = 64 * 1024  # Compressed bytes per IDAT chunk
+PNG_PADDING_CHUNK = b"paDd"  # Private ancillary chunk that decoders skip
+PNG_PADDING_PAYLOAD = 64 * 1024  # Largest padding chunk payload, so padding is produced a chunk at a time
+JPEG_FILL_BYTE = 0xFF  # Decoders skip any number of these before a marker (ITU T.81 B.1.1.2)
+ENCODED_CACHE_SIZE = 16  # Encoded pictures kept in memory, so the 4000x3000 upload cases are encoded once per process
+JPEG_BAD_COMPONENT = 0x09  # Component ID the frame doesn't declare, used to break a corrupt JPEG's scan header
+
+# Standard luminance DC Huffman table (ITU T.81 table K.3), used for every component
+DC_BITS = [0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0]
+DC_VALUES = list(range(12))
+DC_CODES = {0: (0b00, 2), 1: (0b010, 3), 2: (0b011, 3), 3: (0b100, 3), 4: (0b101, 3), 5: (0b110, 3),
+            6: (0b1110, 4), 7: (0b11110, 5), 8: (0b111110, 6), 9: (0b1111110, 7), 10: (0b11111110, 8),
+            11: (0b111111110, 9)}
+# Every block is flat, so the AC table only needs end-of-block, coded as a single 0 bit
+AC_BITS = [1] + [0] * 15
+AC_VALUES = [0x00]
+
+
+class ImageSpec:
+    """Description of a synthetic test image; equal specs always produce identical bytes"""
+
+    def __init__(self, image_format: str = JPEG, width: int = 64, height: int = 64,
+                 byte_size: Optional[int] = None, defect: Optional[str] = None, seed: int = 0):
+        """
+        Initialize the spec
+        Args:
+            image_format: "jpeg" or "png"
+            width: Width in pixels
+            height: Height in pixels
+            byte_size: Exact file size to pad the image to (default: as small as possible); a PNG
+                can't be padded by fewer than 12 bytes
+            defect: One of DEFECTS to produce a deliberately broken file, or None for a valid image
+            seed: Seed for the picture and for any corruption
+        """
+        assert image_format in FORMATS, f"Unknown image format: {image_format}"
+        assert width > 0 and height > 0, "Dimensions must be positive"
+        assert image_format != JPEG or max(width, height) <= MAX_JPEG_DIMENSION, \
+            f"JPEG dimensions can't exceed {MAX_JPEG_DIMENSION}"
+        assert defect is None or defect in DEFECTS, f"Unknown defect: {defect}"
+        assert byte_size is None or byte_size >= 0, "Byte size can't be negative"
+        self.image_format = image_format
+        self.width = width
+        self.height = height
+        self.byte_size = byte_size
+        self.defect = defect
+        self.seed = seed
+
+    @property
+    def filename(self) -> str:
+        """File name for the upload naming every field that sets specs apart, e.g. "synthetic_jpeg_640x480_5242880b_s0.jpg" """
+        extension_format = self.image_format
+        if self.defect == WRONG_EXTENSION:
+            extension_format = PNG if self.image_format == JPEG else JPEG
+        size = f"_{self.byte_size}b" if self.byte_size is not None else ""
+        defect = f"_{self.defect}" if self.defect else ""
+        return (f"synthetic_{self.image_format}_{self.width}x{self.height}{size}_s{self.seed}{defect}"
+                f".{EXTENSIONS[extension_format]}")
+
+    def key(self) -> str:
+        """Stable identifier of the spec, used to find it in the cache"""
+        # The stdlib can sort keys, which keeps the digest stable whichever codec is in use
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the spec to a dictionary"""
+        return {
+            "format": self.image_format,
+            "width": self.width,
+            "height": self.height,
+            "byte_size": self.byte_size,
+            "defect": self.defect,
+            "seed": self.seed
+        }
+
+
+def _block_colours(spec: ImageSpec) -> Iterator[List[Tuple[int, int, int]]]:
+    """Yield one row of block colours at a time: a seeded mosaic over a gradient"""
+    rng = random.Random(spec.seed)
+    blocks_x = -(-spec.width // BLOCK)
+    blocks_y = -(-spec.height // BLOCK)
+    for by in range(blocks_y):
+        row = []
+        for bx in range(blocks_x):
+            base = (bx * 255 // max(1, blocks_x - 1), by * 255 // max(1, blocks_y - 1))
+            row.append((base[0], base[1], rng.randrange(256)))
+        yield row
+
+
+class _BitWriter:
+    """Packs Huffman codes into bytes with JPEG byte stuffing"""
+
+    def __init__(self):
+        self.output = bytearray()
+        self._bits = 0
+        self._count = 0
+
+    def write(self, code: int, length: int) -> None:
+        self._bits = (self._bits << length) | code
+        self._count += length
+        while self._count >= 8:
+            self._count -= 8
+            byte = (self._bits >> self._count) & 0xFF
+            self.output.append(byte)
+            if byte == 0xFF:
+                self.output.append(0x00)
+        self._bits &= (1 << self._count) - 1
+
+    def flush(self) -> bytes:
+        if self._count:
+            self.write((1 << (8 - self._count)) - 1, 8 - self._count)  # Pad with 1 bits
+        return bytes(self.output)
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    return struct.pack(">HH", 0xFF00 | marker, len(payload) + 2) + payload
+
+
+def _encode_jpeg(spec: ImageSpec) -> Tuple[bytes, bytes, bytes]:
+    """
+    Encode a baseline YCbCr JPEG made of flat 8x8 blocks
+    Returns:
+        Header segments, entropy-coded scan data and the end-of-image marker
+    """
+    header = b"\xff\xd8" + _jpeg_segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+    # With a quantizer of 8 a flat block's DC coefficient is exactly its level-shifted value
+    header += _jpeg_segment(0xDB, b"\x00" + bytes([8] * 64))
+    header += _jpeg_segment(0xC0, struct.pack(">BHHB", 8, spec.height, spec.width, 3)
+                            + b"\x01\x11\x00\x02\x11\x00\x03\x11\x00")
+    header += _jpeg_segment(0xC4, b"\x00" + bytes(DC_BITS) + bytes(DC_VALUES))
+    header += _jpeg_segment(0xC4, b"\x10" + bytes(AC_BITS) + bytes(AC_VALUES))
+    header += _jpeg_segment(0xDA, b"\x03\x01\x00\x02\x00\x03\x00\x00\x3f\x00")
+
+    writer = _BitWriter()
+    previous = [0, 0, 0]
+    for row in _block_colours(spec):
+        for r, g, b in row:
+            ycbcr = (0.299 * r + 0.587 * g + 0.114 * b,
+                     128 - 0.168736 * r - 0.331264 * g + 0.5 * b,
+                     128 + 0.5 * r - 0.418688 * g - 0.081312 * b)
+            for component, value in enumerate(ycbcr):
+                dc = max(0, min(255, round(value))) - 128
+                diff = dc - previous[component]
+                previous[component] = dc
+                category = abs(diff).bit_length()
+                writer.write(*DC_CODES[category])
+                if category:
+                    writer.write(diff if diff > 0 else diff + (1 << category) - 1, category)
+                writer.write(0, 1)  # End of block
+    return header, writer.flush(), b"\xff\xd9"
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def _encode_png(spec: ImageSpec) -> Tuple[bytes, bytes, bytes]:
+    """
+    Encode an RGB PNG, compressing one row at a time
+    Returns:
+        Signature and IHDR, IDAT chunks, and the IEND chunk
+    """
+    header = b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", spec.width, spec.height,
+                                                                       8, 2, 0, 0, 0))
+    compressor = zlib.compressobj(6)
+    data = io.BytesIO()
+    pending = bytearray()
+    rows = 0
+    for row in _block_colours(spec):
+        line = b"\x00" + b"".join(bytes(colour) * BLOCK for colour in row)[:spec.width * 3]
+        for _ in range(min(BLOCK, spec.height - rows)):
+            pending += compressor.compress(line)
+            rows += 1
+        while len(pending) >= PNG_IDAT_SIZE:
+            data.write(_png_chunk(b"IDAT", bytes(pending[:PNG_IDAT_SIZE])))
+            del pending[:PNG_IDAT_SIZE]
+    pending += compressor.flush()
+    data.write(_png_chunk(b"IDAT", bytes(pending)))
+    return header, data.getvalue(), _png_chunk(b"IEND", b"")
+
+
+@functools.lru_cache(maxsize=ENCODED_CACHE_SIZE)
+def _encode(image_format: str, width: int, height: int, seed: int) -> Tuple[bytes, bytes, bytes]:
+    """Encode the picture once for all specs that share it, whatever their size or defect"""
+    spec = ImageSpec(image_format, width, height, seed=seed)
+    return _encode_jpeg(spec) if image_format == JPEG else _encode_png(spec)
+
+
+def _padding_sizes(spec: ImageSpec, needed: int) -> Tuple[List[int], int]:
+    """
+    Plan filler that brings a file up to its requested size
+    Returns:
+        Payload sizes of the segments decoders skip, inserted before the image data, and the number of
+        JPEG fill bytes for a gap smaller than a comment segment
+    """
+    overhead = 4 if spec.image_format == JPEG else PNG_CHUNK_OVERHEAD
+    limit = JPEG_SEGMENT_PAYLOAD if spec.image_format == JPEG else PNG_PADDING_PAYLOAD
+    assert spec.image_format == JPEG or not 0 < needed < overhead, \
+        f"Can't pad a PNG by {needed} bytes, every chunk adds at least {overhead}"
+    sizes = []
+    while needed >= overhead:
+        size = min(limit, needed - overhead)
+        if 0 < needed - overhead - size < overhead:
+            size -= overhead  # Leave room for one more whole segment rather than a gap none fits
+        sizes.append(size)
+        needed -= overhead + size
+    return sizes, needed
+
+
+def _padding_segments(spec: ImageSpec, sizes: List[int]) -> Iterator[bytes]:
+    """Yield the padding segments one at a time"""
+    rng = random.Random(spec.seed + 1)
+    for size in sizes:
+        payload = rng.randbytes(size)
+        yield _jpeg_segment(0xFE, payload) if spec.image_format == JPEG else _png_chunk(PNG_PADDING_CHUNK, payload)
+
+
+def _apply_defect(spec: ImageSpec, header: bytes, data: bytes, trailer: bytes) -> bytes:
+    if spec.defect == EMPTY:
+        return b""
+    if spec.defect == TRUNCATED:
+        return header + data[:len(data) // 2]
+    if spec.defect == BAD_MAGIC:
+        return b"\x00" * 8 + (header + data + trailer)[8:]
+    if spec.defect == CORRUPT:
+        rng = random.Random(spec.seed + 2)
+        data = bytearray(data)
+        for _ in range(max(1, len(data) // 100)):
+            data[rng.randrange(len(data))] ^= 0xFF
+        if spec.image_format == JPEG:
+            # Flipped entropy-coded bits still decode to some picture, so also point the scan at a
+            # component the frame doesn't have and drop the end-of-image marker
+            header = bytearray(header)
+            header[header.rindex(b"\xff\xda") + 5] = JPEG_BAD_COMPONENT
+            return bytes(header) + bytes(data)
+        return header + bytes(data) + trailer
+    return header + data + trailer
+
+
+def iter_bytes(spec: ImageSpec) -> Iterator[bytes]:
+    """
+    Generate the bytes of a synthetic image a piece at a time; padding, the bulk of a large file,
+    is produced one segment at a time, while the encoded picture itself is built in memory
+    Args:
+        spec: Description of the image
+    Yields:
+        Consecutive pieces of the file
+    """
+    header, data, trailer = _encode(spec.image_format, spec.width, spec.height, spec.seed)
+    content = _apply_defect(spec, header, data, trailer)
+    if spec.byte_size is None or spec.defect == EMPTY:
+        yield content
+        return
+
+    assert spec.byte_size >= len(content), \
+        f"A {spec.width}x{spec.height} {spec.image_format} needs at least {len(content)} bytes"
+    sizes, fill = _padding_sizes(spec, spec.byte_size - len(content))
+    # Comments go straight after start-of-image, ancillary chunks after IHDR
+    split = 2 if spec.image_format == JPEG else len(header)
+    yield content[:split]
+    yield from _padding_segments(spec, sizes)
+    if fill:
+        # Fill bytes go before the quantization table, past the APP0 marker that file sniffers look for
+        marker = content.index(b"\xff\xdb")
+        yield content[split:marker]
+        yield bytes([JPEG_FILL_BYTE]) * fill
+        split = marker
+    yield content[split:]
+
+
+def generate(spec: ImageSpec) -> bytes:
+    """
+    Generate the bytes of a synthetic image
+    Args:
+        spec: Description of the image
+    Returns:
+        The file contents
+    """
+    return b"".join(iter_bytes(spec))
+
+
+class ImageCorpus:
+    """Generates synthetic images on demand, optionally keeping them in a content-addressed disk cache"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the corpus
+        Args:
+            cache_dir: Directory for cached images (default: generate in memory every time)
+        """
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = {}
+        self.generated = 0
+        self.cache_hits = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            index_path = os.path.join(cache_dir, "index.json")
+            if os.path.exists(index_path):
+                with open(index_path, "rb") as f:
+                    self._index = json_codec.loads(f.read())
+
+    def _blob_path(self, digest: str, spec: ImageSpec) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.{spec.filename.rsplit('.', 1)[1]}")
+
+    def path(self, spec: ImageSpec) -> str:
+        """
+        Get a cached file holding the image, generating it on first use
+        Args:
+            spec: Description of the image
+        Returns:
+            Path of the file, named by the SHA-256 of its contents
+        """
+        assert self.cache_dir, "The corpus has no cache directory"
+        key = spec.key()
+        with self._lock:
+            digest = self._index.get(key)
+            if digest and os.path.exists(self._blob_path(digest, spec)):
+                self.cache_hits += 1
+                return self._blob_path(digest, spec)
+
+        # Stream the file to disk, hashing it on the way, rather than building it in memory
+        hasher = hashlib.sha256()
+        staging = os.path.join(self.cache_dir, f"{key}.{threading.get_ident()}.tmp")
+        with open(staging, "wb") as f:
+            for chunk in iter_bytes(spec):
+                hasher.update(chunk)
+                f.write(chunk)
+        digest = hasher.hexdigest()
+        path = self._blob_path(digest, spec)
+        with self._lock:
+            self.generated += 1
+            if os.path.exists(path):
+                os.remove(staging)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(staging, path)
+            self._index[key] = digest
+            json_codec.dump_to_file(self._index, os.path.join(self.cache_dir, "index.json.tmp"))
+            os.replace(os.path.join(self.cache_dir, "index.json.tmp"), os.path.join(self.cache_dir, "index.json"))
+        return path
+
+    def open(self, spec: ImageSpec) -> BinaryIO:
+        """
+        Open the image as a binary stream, ready to pass to CatApiClient.upload_image
+        Args:
+            spec: Description of the image
+        Returns:
+            A file from the cache, or an in-memory stream without one
+        """
+        if self.cache_dir:
+            return open(self.path(spec), "rb")
+        with self._lock:
+            self.generated += 1
+        return io.BytesIO(generate(spec))
+
+    def source(self, spec: ImageSpec) -> Union[str, bytes]:
+        """
+        Get the image in a form UploadQueue.submit and CatApiClient.upload_image accept
+        Args:
+            spec: Description of the image
+        Returns:
+            Path of the cached file, or the bytes without a cache
+        """
+        if self.cache_dir:
+            return self.path(spec)
+        with self._lock:
+            self.generated += 1
+        return generate(spec)
+
+    def submit_all(self, upload_queue: 'UploadQueue', specs: List[ImageSpec],
+                   sub_id: Optional[str] = None) -> None:
+        """
+        Queue images for upload under their spec's file name
+        Args:
+            upload_queue: Queue to submit the images to
+            specs: Descriptions of the images
+            sub_id: Optional ID of the user the images belong to
+        """
+        for spec in specs:
+            upload_queue.submit(self.source(spec), sub_id=sub_id, filename=spec.filename)
+
+    def upload_cases(self, seed: int = 0) -> List[ImageSpec]:
+        """
+        Build the upload test cases: both formats, small and large, extreme aspect ratios and every defect
+        Args:
+            seed: Seed shared by all cases
+        Returns:
+            List of image specs
+        """
+        cases = []
+        for image_format in FORMATS:
+            cases.append(ImageSpec(image_format, 1, 1, seed=seed))
+            cases.append(ImageSpec(image_format, 640, 480, seed=seed))
+            cases.append(ImageSpec(image_format, 4000, 3000, seed=seed))
+            cases.append(ImageSpec(image_format, 2000, 50, seed=seed))
+            cases.append(ImageSpec(image_format, 50, 2000, seed=seed))
+            cases.append(ImageSpec(image_format, 640, 480, byte_size=5 * 1024 * 1024, seed=seed))
+            for defect in DEFECTS:
+                cases.append(ImageSpec(image_format, 640, 480, defect=defect, seed=seed))
+        return cases
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of images generated and served from the cache"""
+        with self._lock:
+            return {"generated": self.generated, "cache_hits": self.cache_hits, "cached": len(self._index)}
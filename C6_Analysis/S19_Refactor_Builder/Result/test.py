@@ -0,0 +1,720 @@
+import asyncio
+import gzip
+import random
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+from C6_Analysis.S19_Refactor_Builder.Result.async_cat_api_client import AsyncCatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result.builder import VoteGeneratorBuilder
+from C6_Analysis.S19_Refactor_Builder.Result.bulk_delete import BulkDeleter, DELETED, NOT_FOUND, FAILED
+from C6_Analysis.S19_Refactor_Builder.Result.cassette import Cassette, RECORD, REPLAY, UnmatchedRequestError
+from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+from C6_Analysis.S19_Refactor_Builder.Result import client_pool
+from C6_Analysis.S19_Refactor_Builder.Result.client_pool import CatApiClientPool
+from C6_Analysis.S19_Refactor_Builder.Result.fake_cat_api import FakeCatApi
+from C6_Analysis.S19_Refactor_Builder.Result.favourites import FavouritesBatch, CREATED, DUPLICATE
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.main_generator import VOTE_WINDOW_FACTOR
+from C6_Analysis.S19_Refactor_Builder.Result.metrics import LatencyHistogram, ClientMetrics
+from C6_Analysis.S19_Refactor_Builder.Result.rate_limiter import RateLimiter, TokenBucket, NoRateLimit
+from C6_Analysis.S19_Refactor_Builder.Result.retry_policy import (
+    RetryPolicy, CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+)
+from C6_Analysis.S19_Refactor_Builder.Result.run_journal import RunJournal
+from C6_Analysis.S19_Refactor_Builder.Result.streaming_result import StreamingVoteGenerationResult, read_records
+from C6_Analysis.S19_Refactor_Builder.Result.synthetic_images import ImageSpec, generate, JPEG, PNG, PNG_CHUNK_OVERHEAD
+
+# Constants
+API_KEY = "test-api-key"  # The fake accepts any key
+QUOTA = 2  # Requests per second the throttled fake allows per key
+WORKERS = 4  # Worker threads used by the parallel voting tests
+UNREACHABLE_URL = "http://127.0.0.1:9/v1"  # Discard port, nothing listens there
+
+
+@pytest.fixture(scope="module")
+def throttled_cat_api():
+    """
+    Fixture running a fake of The Cat API that answers 429 above QUOTA requests per second.
+
+    Yields:
+        C6_Analysis.S19_Refactor_Builder.Result.fake_cat_api.FakeCatApi: The running fake API
+    """
+    with FakeCatApi(requests_per_second=QUOTA) as api:
+        yield api
+
+
+def start_of_second():
+    """Sleep until just after the next second starts, so a burst lands in one quota window"""
+    time.sleep(1.0 - time.time() % 1.0 + 0.01)
+
+
+def throttle_response(status_code, **headers):
+    """Build a response carrying rate limit headers"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    return response
+
+
+def test_token_bucket_allows_burst_then_paces():
+    """Test that a token bucket hands out its burst at once, then waits for refills"""
+    bucket = TokenBucket(rate=20.0, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.05, abs=0.02)
+
+
+def test_rate_limiter_shares_the_key_quota_across_endpoints():
+    """Test that the quota reported on one endpoint limits every endpoint, and 429 pauses them all"""
+    limiter = RateLimiter(rate=100.0, burst=100)
+    ok = throttle_response(200, **{"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "2",
+                                   "X-RateLimit-Reset": "0.5"})
+    assert limiter.observe("GET /votes", ok) is None
+    assert limiter.budget("GET /votes") == pytest.approx(2.0, abs=0.1)
+    assert limiter.budget("POST /votes") == pytest.approx(2.0, abs=0.1)
+
+    throttled = throttle_response(429, **{"X-RateLimit-Remaining": "0", "Retry-After": "1"})
+    assert limiter.observe("POST /votes", throttled) == 1.0
+    assert limiter.budget("GET /images/search") < 0
+    assert limiter.stats()["throttled_responses"] == 1
+
+
+def test_rate_limiter_endpoint_caps_apply_on_top_of_the_key_quota():
+    """Test that an endpoint cap slows only its endpoint while both draw from the key's budget"""
+    limiter = RateLimiter(rate=1.0, burst=10, endpoint_limits={"POST /votes": (20.0, 1)})
+    assert limiter.budget("POST /votes") == pytest.approx(1.0)
+    assert limiter.acquire("POST /votes") == 0.0
+    assert limiter.acquire("POST /votes") == pytest.approx(0.05, abs=0.02)
+    assert limiter.acquire("GET /votes") == 0.0
+    assert limiter.budget("GET /votes") == pytest.approx(7.0, abs=0.5)
+
+
+def test_client_retries_after_throttling(throttled_cat_api):
+    """
+    Test that a request answered with 429 waits for Retry-After and then succeeds.
+
+    Args:
+        throttled_cat_api: Fake API with a quota of QUOTA requests per second
+    """
+    start_of_second()
+    # Another client uses up the key's quota for this second
+    with CatApiClient(API_KEY, base_url=throttled_cat_api.base_url, rate_limiter=NoRateLimit(),
+                      retry_policies={"GET": RetryPolicy(max_attempts=1)}) as other:
+        statuses = [other._request("GET", "/images/search").status_code for _ in range(QUOTA + 1)]
+    assert statuses[-1] == 429
+
+    with CatApiClient(API_KEY, base_url=throttled_cat_api.base_url) as client:
+        started = time.monotonic()
+        assert client.find_random_image()["id"]
+        endpoint = client.metrics.snapshot()["endpoints"]["GET /images/search"]
+
+    assert 0.0 < time.monotonic() - started < 2.0
+    assert endpoint["retries"] == 1
+    assert endpoint["latency"]["429"]["count"] == 1
+    assert endpoint["latency"]["200"]["count"] == 1
+    assert client.rate_limiter.stats()["throttled_responses"] == 1
+
+
+def test_async_delete_all_votes_pages_and_leaves_shared_client_open(api_client, monkeypatch):
+    """
+    Test that the async client deletes more than a page of votes, and that closing it
+    leaves a client it was given open for its owner.
+
+    Args:
+        api_client: The Cat API client fixture, shared with the async client
+        monkeypatch: Used to watch for the shared client being closed
+    """
+    closed = []
+    monkeypatch.setattr(api_client, "close", lambda: closed.append(api_client))
+
+    async def run():
+        async with AsyncCatApiClient(API_KEY, max_concurrency=4, client=api_client) as async_client:
+            image = await async_client.find_random_image()
+            await asyncio.gather(*(async_client.add_vote(image["id"], f"test-user-{i:04d}") for i in range(150)))
+            return await async_client.delete_all_votes()
+
+    assert asyncio.run(run()) == 150
+    assert api_client.get_votes() == []
+    assert not closed
+
+
+def cast_votes(api_client, count):
+    """Cast votes from distinct sub_ids on one random image and return their IDs"""
+    image_id = api_client.find_random_image()["id"]
+    return [api_client.add_vote(image_id, f"test-user-{i:04d}")["id"] for i in range(1, count + 1)]
+
+
+def test_bulk_delete_classifies_each_id(api_client, monkeypatch):
+    """
+    Test that a bulk delete reports deleted, already gone and failed IDs separately.
+
+    Args:
+        api_client: The Cat API client fixture
+        monkeypatch: Used to make one delete fail
+    """
+    vote_ids = cast_votes(api_client, 3)
+    delete_resource = api_client.delete_resource
+
+    def flaky_delete_resource(resource, resource_id):
+        if resource_id == vote_ids[2]:
+            raise requests.ConnectionError("Connection reset by peer")
+        return delete_resource(resource, resource_id)
+
+    monkeypatch.setattr(api_client, "delete_resource", flaky_delete_resource)
+    report = BulkDeleter(api_client).delete_votes(vote_ids[:2] + [999999, vote_ids[2]])
+
+    assert [(outcome["id"], outcome["status"]) for outcome in report.outcomes] == \
+        [(vote_ids[0], DELETED), (vote_ids[1], DELETED), (999999, NOT_FOUND), (vote_ids[2], FAILED)]
+    assert report.failed_ids == [vote_ids[2]]
+    assert report.to_dict()["not_found"] == 1
+    assert [vote["id"] for vote in api_client.get_votes()] == [vote_ids[2]]
+
+
+def test_bulk_delete_keeps_max_workers_in_flight(api_client, monkeypatch):
+    """
+    Test that a bulk delete runs deletes in parallel but never more than max_workers at once.
+
+    Args:
+        api_client: The Cat API client fixture
+        monkeypatch: Used to track deletes in flight
+    """
+    vote_ids = cast_votes(api_client, 24)
+    delete_resource = api_client.delete_resource
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def tracked_delete_resource(resource, resource_id):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        try:
+            time.sleep(0.02)
+            return delete_resource(resource, resource_id)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    monkeypatch.setattr(api_client, "delete_resource", tracked_delete_resource)
+    report = BulkDeleter(api_client, max_workers=3).delete_votes(vote_ids)
+
+    assert report.deleted == 24
+    assert peak[0] == 3
+
+
+def test_bulk_delete_fails_each_id_while_the_circuit_is_open(api_client):
+    """
+    Test that an open circuit fails every ID in the report instead of aborting the batch.
+
+    Args:
+        api_client: The Cat API client fixture
+    """
+    vote_ids = cast_votes(api_client, 5)
+    api_client.circuit_breaker = CircuitBreaker(failure_threshold=1)
+    api_client.circuit_breaker.record_failure()
+
+    report = BulkDeleter(api_client).delete_votes(vote_ids)
+
+    assert report.failed_ids == vote_ids
+    assert all("Circuit open" in outcome["error"] for outcome in report.outcomes)
+    assert api_client.circuit_breaker.stats()["rejected"] == 5
+
+
+def test_retry_policy_only_resends_safe_requests():
+    """Test which statuses each kind of retry policy resends and how long it waits"""
+    idempotent = RetryPolicy()
+    post = RetryPolicy(idempotent=False)
+    assert idempotent.should_retry_status(500)
+    assert not post.should_retry_status(500)
+    assert post.should_retry_status(429) and post.should_retry_status(503)
+    assert not idempotent.should_retry_status(404)
+
+    random.seed(0)
+    delay = None
+    for _ in range(20):
+        delay = idempotent.next_delay(delay)
+        assert idempotent.base_delay <= delay <= idempotent.max_delay
+
+    started = time.monotonic()
+    assert idempotent.can_retry(1, started, 0.1)
+    assert not idempotent.can_retry(idempotent.max_attempts, started, 0.1)
+    assert not RetryPolicy(deadline=1.0).can_retry(1, started, 2.0)
+
+
+def test_attempt_timeout_never_outlasts_the_deadline():
+    """Test that each attempt's timeouts shrink to the time left before the policy's deadline"""
+    policy = RetryPolicy(deadline=10.0, connect_timeout=3.0, read_timeout=15.0)
+    assert policy.attempt_timeout(time.monotonic()) == (3.0, pytest.approx(10.0, abs=0.01))
+    assert policy.attempt_timeout(time.monotonic() - 9.0) == (pytest.approx(1.0, abs=0.01),) * 2
+    assert RetryPolicy(deadline=None, read_timeout=15.0).attempt_timeout(0.0)[1] == 15.0
+
+
+def test_hung_server_is_cut_off_at_the_deadline():
+    """Test that a server that accepts the connection but never answers can't block a request"""
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        base_url = f"http://127.0.0.1:{server.getsockname()[1]}/v1"
+        client = CatApiClient(API_KEY, base_url=base_url, rate_limiter=NoRateLimit(),
+                              retry_policies={"GET": RetryPolicy(deadline=0.5)})
+        with client:
+            started = time.monotonic()
+            with pytest.raises(requests.ReadTimeout):
+                client.find_random_image()
+            assert time.monotonic() - started < 1.5
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test the closed, open, half-open and closed again transitions of the circuit breaker"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    breaker.before_request("GET /votes")
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("GET /votes")
+
+    # After the cool-down one trial goes through while the rest are still rejected
+    time.sleep(0.06)
+    breaker.before_request("GET /votes")
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("GET /votes")
+
+    # A failed trial opens the circuit again straight away
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    time.sleep(0.06)
+    breaker.before_request("GET /votes")
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_request("GET /votes")
+
+    assert breaker.stats() == {"state": CLOSED, "consecutive_failures": 0, "times_opened": 2, "rejected": 2}
+
+
+def test_client_fails_fast_while_api_is_down(fake_cat_api):
+    """
+    Test that the client stops sending requests once the circuit opens and closes it again
+    when the API is back.
+
+    Args:
+        fake_cat_api: The running fake API
+    """
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    client = CatApiClient(API_KEY, base_url=UNREACHABLE_URL, rate_limiter=NoRateLimit(),
+                          retry_policies={"GET": RetryPolicy(max_attempts=1)}, circuit_breaker=breaker)
+    with client:
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                client.find_random_image()
+        with pytest.raises(CircuitOpenError):
+            client.find_random_image()
+
+        client.base_url = fake_cat_api.base_url
+        time.sleep(0.06)
+        assert client.find_random_image()["id"]
+        assert breaker.state == CLOSED
+
+
+def test_latency_histogram_percentiles():
+    """Test that histogram percentiles stay within the bucket resolution of the exact values"""
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.to_dict()["count"] == 0
+
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000.0)
+
+    summary = histogram.to_dict()
+    assert summary["count"] == 1000
+    assert summary["min_ms"] == 1.0
+    assert summary["max_ms"] == 1000.0
+    assert summary["mean_ms"] == pytest.approx(500.5)
+    for percent, exact_ms in [(50, 500), (90, 900), (99, 990)]:
+        assert histogram.percentile(percent) == pytest.approx(exact_ms, rel=0.04)
+
+
+def test_client_metrics_record_every_attempt(fake_cat_api):
+    """
+    Test that the client records requests per endpoint and status and dumps them as JSON.
+
+    Args:
+        fake_cat_api: The running fake API
+    """
+    metrics = ClientMetrics()
+    with CatApiClient(API_KEY, base_url=fake_cat_api.base_url, rate_limiter=NoRateLimit(),
+                      metrics=metrics) as client:
+        image = client.find_random_image()
+        client.add_vote(image["id"], "test-user-metrics")
+        with pytest.raises(AssertionError):
+            client.get_image("missing")
+
+    endpoints = json_codec.loads(metrics.to_json())["endpoints"]
+    assert endpoints["GET /images/search"]["requests"] == 1
+    assert endpoints["POST /votes"]["bytes_out"] > 0
+    assert endpoints["GET /images/{image_id}"]["latency"]["400"]["count"] == 1
+
+
+def test_cassette_replays_recorded_traffic(fake_cat_api, tmp_path):
+    """
+    Test that traffic recorded against the fake replays without reaching it, and that the
+    cassette never stores the API key.
+
+    Args:
+        fake_cat_api: The running fake API
+        tmp_path: Temporary directory for the cassette
+    """
+    path = str(tmp_path / "cassette.jsonl.gz")
+    fake_cat_api.reset()
+
+    with CatApiClient(API_KEY, base_url=fake_cat_api.base_url, rate_limiter=NoRateLimit(),
+                      cassette=Cassette(path, mode=RECORD)) as client:
+        image = client.find_random_image()
+        vote = client.add_vote(image["id"], "test-user-cassette")
+        recorded_votes = client.get_votes_for_image(image["id"])
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert API_KEY not in f.read()
+
+    fake_cat_api.reset()
+    requests_before = fake_cat_api.request_count
+    cassette = Cassette(path, mode=REPLAY)
+    with CatApiClient(API_KEY, base_url=fake_cat_api.base_url, cassette=cassette) as client:
+        assert client.find_random_image() == image
+        assert client.add_vote(image["id"], "test-user-cassette") == vote
+        assert client.get_votes_for_image(image["id"]) == recorded_votes
+        with pytest.raises(UnmatchedRequestError):
+            client.get_image(image["id"])
+
+    assert fake_cat_api.request_count == requests_before
+    assert cassette.stats()["replayed"] == 3
+    assert cassette.stats()["unmatched"] == 1
+
+
+
+def test_client_pool_remembers_a_bounded_number_of_vote_owners(fake_cat_api, monkeypatch):
+    """
+    Test that the pool forgets the owners of deleted and old votes, and still deletes a vote
+    whose owner it no longer remembers by trying every key.
+
+    Args:
+        fake_cat_api: The running fake API
+        monkeypatch: Pytest fixture for shrinking the owner map
+    """
+    monkeypatch.setattr(client_pool, "MAX_TRACKED_VOTES", 3)
+    fake_cat_api.reset()
+
+    with CatApiClientPool(["test-key-1", "test-key-2"], base_url=fake_cat_api.base_url,
+                          rate_limiter_factory=NoRateLimit) as pool:
+        image = pool.find_random_image()
+        votes = [pool.add_vote(image["id"], "test-user-pool") for _ in range(5)]
+        assert list(pool._vote_owner) == [vote["id"] for vote in votes[2:]]
+
+        assert pool.delete_vote(votes[4]["id"])
+        assert votes[4]["id"] not in pool._vote_owner
+        assert pool.delete_vote(votes[0]["id"])
+        assert len(pool.get_votes("test-user-pool")) == 3
+
+
+def test_resent_favourite_returns_the_existing_one(api_client):
+    """
+    Test that adding a favourite the account already has, as a resend after a lost response
+    would, returns the favourite created first instead of failing.
+
+    Args:
+        api_client: Client pointed at the fake API
+    """
+    image = api_client.find_random_image()
+    favourite = api_client.add_favourite(image["id"], "test-user-favourites")
+    assert api_client.add_favourite(image["id"], "test-user-favourites")["id"] == favourite["id"]
+    assert len(api_client.get_favourites_for_image(image["id"])) == 1
+
+
+def test_bulk_create_reports_each_item(api_client):
+    """
+    Test that a bulk create counts created, duplicate and failed favourites like a bulk delete
+    counts its outcomes.
+
+    Args:
+        api_client: Client pointed at the fake API
+    """
+    image = api_client.find_random_image()
+    report = FavouritesBatch(api_client, max_workers=2).create(
+        [(image["id"], "test-user-1"), (image["id"], "test-user-1"), ("missing", "test-user-1")])
+
+    summary = report.to_dict()
+    assert [summary[status] for status in ["requested", CREATED, DUPLICATE, "failed"]] == [3, 1, 1, 1]
+    assert len(report.created_ids) == 1 and report.created_ids[0] is not None
+    assert [item["image_id"] for item in report.failed_items] == ["missing"]
+
+    deleted = FavouritesBatch(api_client).delete(report.created_ids + [report.created_ids[0]])
+    assert deleted.to_dict()["deleted"] == 1 and deleted.to_dict()["not_found"] == 1
+
+
+@pytest.mark.parametrize("image_format, end", [(JPEG, b"\xff\xd9"), (PNG, b"IEND\xaeB`\x82")])
+def test_padded_images_are_exact_and_end_with_their_end_marker(image_format, end):
+    """
+    Test that padding lands inside the file as segments decoders skip, never after the end marker,
+    for gaps around the segment overhead and the largest segment payload.
+
+    Args:
+        image_format: "jpeg" or "png"
+        end: Bytes every padded file must end with
+    """
+    natural = len(generate(ImageSpec(image_format, 64, 64)))
+    overhead = 4 if image_format == JPEG else PNG_CHUNK_OVERHEAD
+    gaps = [1, 3, 4, 5, 11, 12, 13, 65537, 65539, 65548, 2 * 65548 + 1]
+    for gap in [gap for gap in gaps if image_format == JPEG or gap >= overhead]:
+        data = generate(ImageSpec(image_format, 64, 64, byte_size=natural + gap))
+        assert len(data) == natural + gap and data.endswith(end), gap
+
+    with pytest.raises(AssertionError):
+        generate(ImageSpec(PNG, 64, 64, byte_size=len(generate(ImageSpec(PNG, 64, 64))) + 5))
+
+
+def parallel_builder(api_client, num_votes, ordered=True):
+    """
+    Builder for a run on one image with sequential sub_ids, cast on WORKERS threads
+
+    Args:
+        api_client: The Cat API client
+        num_votes: Number of votes to cast
+        ordered: Whether votes are recorded in plan order rather than as they finish
+    """
+    return (VoteGeneratorBuilder(api_client)
+            .with_vote_count(num_votes)
+            .with_single_image()
+            .with_sequential_user_ids()
+            .with_all_upvotes()
+            .with_concurrency(WORKERS, ordered=ordered)
+            .with_result_saving(False))
+
+
+def slow_first_votes(api_client, monkeypatch):
+    """
+    Make the first votes of a run finish last, so completion order differs from plan order
+
+    Args:
+        api_client: The Cat API client
+        monkeypatch: Used to wrap add_vote
+    """
+    add_vote = api_client.add_vote
+
+    def delayed_add_vote(image_id, sub_id, value=1):
+        index = int(sub_id.rsplit("-", 1)[1])
+        time.sleep(max(0, WORKERS - index) * 0.05)
+        return add_vote(image_id, sub_id, value)
+
+    monkeypatch.setattr(api_client, "add_vote", delayed_add_vote)
+
+
+def plan_order(num_votes):
+    """Sub_ids of a sequential run in the order the votes were planned"""
+    return [f"test-user-{i:04d}" for i in range(1, num_votes + 1)]
+
+
+def test_parallel_votes_are_recorded_in_plan_order(api_client, monkeypatch):
+    """
+    Test that votes cast on several workers are recorded in plan order by default,
+    even when later votes finish first.
+
+    Args:
+        api_client: The Cat API client fixture
+        monkeypatch: Used to slow down the first votes
+    """
+    slow_first_votes(api_client, monkeypatch)
+    result = parallel_builder(api_client, 20).build().generate()
+
+    assert [vote["sub_id"] for vote in result.votes] == plan_order(20)
+    assert len(api_client.get_votes()) == 20
+    assert not result.errors
+    assert not result.discrepancies
+
+
+def test_unordered_parallel_votes_are_recorded_as_they_finish(api_client, monkeypatch):
+    """
+    Test that unordered runs record votes as they finish, and still record every vote once.
+
+    Args:
+        api_client: The Cat API client fixture
+        monkeypatch: Used to slow down the first votes
+    """
+    slow_first_votes(api_client, monkeypatch)
+    result = parallel_builder(api_client, 20, ordered=False).build().generate()
+
+    recorded = [vote["sub_id"] for vote in result.votes]
+    assert recorded != plan_order(20)
+    assert sorted(recorded) == plan_order(20)
+    assert recorded.index("test-user-0001") > recorded.index("test-user-0004")
+    assert sorted(vote["id"] for vote in result.votes) == sorted(vote["id"] for vote in api_client.get_votes())
+
+
+def test_parallel_vote_errors_belong_to_their_vote(api_client, monkeypatch):
+    """
+    Test that a vote failing on a worker is recorded as an error for that vote only,
+    while the other votes are still cast.
+
+    Args:
+        api_client: The Cat API client fixture
+        monkeypatch: Used to make some votes fail
+    """
+    add_vote = api_client.add_vote
+    failing = {"test-user-0003", "test-user-0008"}
+
+    def failing_add_vote(image_id, sub_id, value=1):
+        if sub_id in failing:
+            raise requests.HTTPError(f"500 Server Error for {sub_id}")
+        return add_vote(image_id, sub_id, value)
+
+    monkeypatch.setattr(api_client, "add_vote", failing_add_vote)
+    result = parallel_builder(api_client, 10).build().generate()
+
+    assert result.total_votes == 8
+    assert len(api_client.get_votes()) == 8
+    assert sorted((error["vote_index"], error["sub_id"]) for error in result.errors) == \
+        [(2, "test-user-0003"), (7, "test-user-0008")]
+    assert all(error["sub_id"] in error["message"] for error in result.errors)
+    assert failing.isdisjoint(vote["sub_id"] for vote in result.votes)
+
+
+def test_interrupt_cancels_queued_votes(api_client, tmp_path, monkeypatch):
+    """
+    Test that an interrupt stops a parallel run without casting the votes still queued,
+    and that every vote the API accepted before stopping is journaled.
+
+    Args:
+        api_client: The Cat API client fixture
+        tmp_path: Temporary directory for the run file
+        monkeypatch: Used to interrupt the run
+    """
+    run_file = tmp_path / "run.jsonl"
+    add_vote = api_client.add_vote
+    calls = []
+    lock = threading.Lock()
+
+    def interrupted_add_vote(image_id, sub_id, value=1):
+        with lock:
+            calls.append(sub_id)
+            interrupt = len(calls) == 5
+        if interrupt:
+            raise KeyboardInterrupt
+        time.sleep(0.02)
+        return add_vote(image_id, sub_id, value)
+
+    monkeypatch.setattr(api_client, "add_vote", interrupted_add_vote)
+    builder = parallel_builder(api_client, 100).with_run_file(str(run_file))
+    with pytest.raises(KeyboardInterrupt):
+        builder.build().generate()
+
+    # Only votes already queued or running when the interrupt arrived were started
+    assert len(calls) <= 5 + VOTE_WINDOW_FACTOR * WORKERS
+
+    journal = RunJournal(str(run_file))
+    journal.close()
+    votes = api_client.get_votes()
+    assert len(votes) == len(calls) - 1
+    assert sorted(vote["id"] for vote in journal.completed.values()) == sorted(vote["id"] for vote in votes)
+
+
+def test_read_records_skips_truncated_last_line(tmp_path):
+    """
+    Test that a result file cut short by a crash is read up to its last complete record,
+    while corruption before the end is still reported.
+
+    Args:
+        tmp_path: Temporary directory for the result file
+    """
+    path = tmp_path / "votes.jsonl"
+    with StreamingVoteGenerationResult(str(path), flush_every=1) as result:
+        result.add_vote({"id": 1, "image_id": "abc", "sub_id": "test-user-0001", "value": 1})
+        result.add_vote({"id": 2, "image_id": "abc", "sub_id": "test-user-0002", "value": 0})
+    with open(path, "ab") as f:
+        f.write(b'{"type": "vote", "id": 3, "ima')
+
+    assert [record["type"] for record in read_records(str(path))] == ["header", "vote", "vote"]
+
+    # Appending drops the partial line and carries on from the votes already recorded
+    with StreamingVoteGenerationResult(str(path), append=True) as result:
+        assert result.total_votes == 2
+        result.add_vote({"id": 2, "image_id": "abc", "sub_id": "test-user-0002", "value": 0})
+        result.add_vote({"id": 3, "image_id": "abc", "sub_id": "test-user-0003", "value": 1})
+    assert [record.get("id") for record in read_records(str(path))] == [None, 1, 2, 3]
+
+    path.write_bytes(b'{"type": "header"}\n{"type": "vo\n{"type": "vote", "id": 1}\n')
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+
+
+def vote_builder(api_client, run_file):
+    """
+    Builder for a journaled run of 10 votes on one image with sequential sub_ids
+
+    Args:
+        api_client: The Cat API client
+        run_file: Journal file of the run
+    """
+    return (VoteGeneratorBuilder(api_client)
+            .with_vote_count(10)
+            .with_single_image()
+            .with_sequential_user_ids()
+            .with_alternating_votes()
+            .with_result_saving(False)
+            .with_run_file(str(run_file)))
+
+
+def test_interrupted_run_resumes_without_duplicate_votes(api_client, tmp_path, monkeypatch):
+    """
+    Test that resuming an interrupted run casts only the missing votes, continues the sub_id
+    sequence and appends to the streamed results of the first attempt.
+
+    Args:
+        api_client: The Cat API client fixture
+        tmp_path: Temporary directory for the run and result files
+        monkeypatch: Used to interrupt the first attempt
+    """
+    run_file = tmp_path / "run.jsonl"
+    result_file = tmp_path / "votes.jsonl"
+    add_vote = api_client.add_vote
+    calls = []
+
+    def interrupted_add_vote(*args):
+        calls.append(args)
+        if len(calls) > 4:
+            raise KeyboardInterrupt
+        return add_vote(*args)
+
+    monkeypatch.setattr(api_client, "add_vote", interrupted_add_vote)
+    first = vote_builder(api_client, run_file).with_streaming_results().with_result_saving(True, str(result_file))
+    with pytest.raises(KeyboardInterrupt):
+        first.build().generate()
+    assert len(api_client.get_votes()) == 4
+
+    monkeypatch.setattr(api_client, "add_vote", add_vote)
+    second = vote_builder(api_client, run_file).with_streaming_results().with_result_saving(True, str(result_file))
+    result = second.build().generate()
+
+    votes = api_client.get_votes()
+    assert len(votes) == 10
+    assert sorted(vote["sub_id"] for vote in votes) == [f"test-user-{i:04d}" for i in range(1, 11)]
+    assert [vote["value"] for vote in sorted(votes, key=lambda vote: vote["sub_id"])] == [0, 1] * 5
+    assert result.total_votes == 10
+    assert not result.discrepancies
+
+    recorded = [record for record in read_records(str(result_file)) if record["type"] == "vote"]
+    assert sorted(record["id"] for record in recorded) == sorted(vote["id"] for vote in votes)
+
+    journal = RunJournal(str(run_file))
+    journal.close()
+    assert journal.num_votes == 10
+    assert len(journal.planned) == 10
+    assert len(journal.completed) == 10
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,188 @@
+import contextvars
+import functools
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+
+CHROME = "chrome"  # Chrome trace-event JSON, opens in chrome://tracing and Perfetto
+OTLP = "otlp"  # OpenTelemetry OTLP/JSON, as written by the OTLP file exporter
+FORMATS = [CHROME, OTLP]
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes and an optional parent"""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.thread_name = threading.current_thread().name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute, e.g. a status code known only after the call"""
+        self.attributes[key] = value
+
+
+class Tracer:
+    """Collects spans in memory and writes them to a local trace file"""
+
+    def __init__(self, service_name: str = "cat-api-client"):
+        self.service_name = service_name
+        self.enabled = False
+        self.trace_id = secrets.token_hex(16)
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start recording spans"""
+        self.enabled = True
+
+    def stop(self) -> None:
+        """Stop recording spans; recorded spans are kept until cleared"""
+        self.enabled = False
+
+    def clear(self) -> None:
+        """Drop all recorded spans"""
+        with self._lock:
+            self._spans = []
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Time a block as a span nested under the current one
+        Args:
+            name: Span name, e.g. "add_vote" or "HTTP POST /votes"
+            attributes: Attributes to attach to the span
+        Yields:
+            The span, or None while tracing is off
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        span = Span(name, self.trace_id, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            with self._lock:
+                self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        """Return the finished spans recorded so far"""
+        with self._lock:
+            return list(self._spans)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Convert the spans to Chrome trace-event format"""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in self.spans():
+            threads[span.thread_id] = span.thread_name
+            args = dict(span.attributes, span_id=span.span_id)
+            if span.parent_id:
+                args["parent_id"] = span.parent_id
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(" ")[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the spans to OTLP/JSON format"""
+
+        def attribute(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        otlp_spans = []
+        for span in self.spans():
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 3 if span.name.startswith("HTTP ") else 1,  # CLIENT for HTTP calls, INTERNAL otherwise
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [attribute(k, v) for k, v in span.attributes.items()]
+                              + [attribute("thread.name", span.thread_name)],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}]
+        }]}
+
+    def save_to_file(self, filename: str, trace_format: str = CHROME) -> str:
+        """
+        Write the recorded spans to a file
+        Args:
+            filename: File to write
+            trace_format: "chrome" for Chrome trace-event JSON or "otlp" for OTLP/JSON
+        Returns:
+            The file name
+        """
+        assert trace_format in FORMATS, f"Unknown trace format: {trace_format}"
+        data = self.to_chrome() if trace_format == CHROME else self.to_otlp()
+        return json_codec.dump_to_file(data, filename)
+
+
+# Tracer shared by the client, the generator and the setup/cleanup helpers
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None):
+    """Decorator that records each call of a function as a span"""
+
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,323 @@
+import contextvars
+import mimetypes
+import mmap
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, List, Optional, Iterator, Union, BinaryIO, Callable, TYPE_CHECKING
+
+import requests
+
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+from C6_Analysis.S19_Refactor_Builder.Result.retry_policy import CircuitOpenError
+from C6_Analysis.S19_Refactor_Builder.Result.tracing import traced
+
+if TYPE_CHECKING:
+    from C6_Analysis.S19_Refactor_Builder.Result.cat_api_client import CatApiClient
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # Bytes read from the source and sent per chunk
+DEFAULT_UPLOAD_WORKERS = 4  # Uploads in flight at once
+DEFAULT_MAX_PENDING = 16  # Uploads queued or in flight before submit() blocks
+
+UPLOADED = "uploaded"
+REJECTED = "rejected"  # The API refused the file, e.g. no cat found or too large
+FAILED = "failed"
+
+UploadSource = Union[str, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+class MultipartStream:
+    """multipart/form-data body produced chunk by chunk, sent with chunked transfer encoding"""
+
+    def __init__(self, source: UploadSource, filename: Optional[str] = None,
+                 fields: Optional[Dict[str, str]] = None, content_type: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, on_progress: Optional[ProgressCallback] = None):
+        """
+        Initialize the stream
+        Args:
+            source: File path, bytes-like object, memory map or binary file object
+            filename: File name sent to the API (default: the path's base name, or "upload")
+            fields: Extra form fields, e.g. {"sub_id": "user-1"}
+            content_type: Content type of the file part (default: guessed from the file name)
+            chunk_size: Bytes read from the source per chunk
+            on_progress: Called with (bytes sent, total bytes or None) after each chunk
+        """
+        assert chunk_size > 0, "Chunk size must be positive"
+        self.source = source
+        self.filename = filename or (os.path.basename(source) if isinstance(source, str) else "upload")
+        self.content_type = content_type or mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.boundary = uuid.uuid4().hex
+        self.bytes_sent = 0
+        self._start = source.tell() if hasattr(source, "read") else 0
+
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in (fields or {}).items()
+        )
+        self._head = head + (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{self.filename}"\r\n'
+            f'Content-Type: {self.content_type}\r\n\r\n'
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+    @property
+    def header(self) -> str:
+        """Content-Type header value for the request"""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def file_size(self) -> Optional[int]:
+        """Size of the file part in bytes, or None if the source can't tell"""
+        if isinstance(self.source, str):
+            return os.path.getsize(self.source)
+        if isinstance(self.source, (bytes, bytearray, memoryview, mmap.mmap)):
+            return len(self.source)
+        try:
+            return os.fstat(self.source.fileno()).st_size - self._start
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def total_size(self) -> Optional[int]:
+        """Size of the whole body in bytes, or None if the source can't tell"""
+        size = self.file_size()
+        return None if size is None else len(self._head) + size + len(self._tail)
+
+    def _file_chunks(self) -> Iterator[Union[bytes, memoryview]]:
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return  # Empty files can't be memory-mapped
+                # Map the file so chunks come straight from the page cache, one chunk in memory at a time
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, len(mapped), self.chunk_size):
+                        yield mapped[offset:offset + self.chunk_size]
+        elif isinstance(self.source, (bytes, bytearray, memoryview, mmap.mmap)):
+            view = memoryview(self.source)
+            for offset in range(0, len(view), self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
+        else:
+            self.source.seek(self._start)
+            while True:
+                chunk = self.source.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        # Every iteration starts over, so a retried request resends the whole body
+        self.bytes_sent = 0
+        total = self.total_size()
+        for chunk in [self._head], self._file_chunks(), [self._tail]:
+            for part in chunk:
+                yield part
+                self.bytes_sent += len(part)
+                if self.on_progress is not None:
+                    self.on_progress(self.bytes_sent, total)
+
+
+class SizedMultipartStream(MultipartStream):
+    """MultipartStream with a known length, so requests sends it with a Content-Length"""
+
+    def __len__(self) -> int:
+        return self.total_size()
+
+
+def create_multipart_stream(source: UploadSource, chunked: bool = False, **kwargs) -> MultipartStream:
+    """
+    Create a streaming multipart body
+    Args:
+        source: File path, bytes-like object, memory map or binary file object
+        chunked: Whether to send it with chunked transfer encoding instead of a Content-Length
+        kwargs: Passed through to MultipartStream
+    Returns:
+        The body; sources of unknown size are always sent chunked
+    """
+    stream = SizedMultipartStream(source, **kwargs)
+    if chunked or stream.total_size() is None:
+        return MultipartStream(source, **kwargs)
+    return stream
+
+
+class UploadReport:
+    """Per-file outcomes and throughput of an upload queue"""
+
+    def __init__(self):
+        self.outcomes: List[Dict[str, Any]] = []
+        self.start_time = time.time()
+        self.end_time = None
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+
+    def add_outcome(self, outcome: Dict[str, Any]) -> None:
+        """Record the outcome for one file"""
+        with self._lock:
+            self.outcomes.append(outcome)
+
+    def add_bytes(self, count: int) -> None:
+        """Count bytes sent by any upload"""
+        with self._lock:
+            self.bytes_sent += count
+
+    def count(self, status: str) -> int:
+        """Number of files that ended with the given status"""
+        with self._lock:
+            return sum(1 for outcome in self.outcomes if outcome["status"] == status)
+
+    @property
+    def uploaded_ids(self) -> List[str]:
+        """IDs of the uploaded images"""
+        with self._lock:
+            return [outcome["id"] for outcome in self.outcomes if outcome["status"] == UPLOADED]
+
+    def throughput(self) -> float:
+        """Bytes per second sent so far"""
+        elapsed = (self.end_time or time.time()) - self.start_time
+        return self.bytes_sent / elapsed if elapsed > 0 else 0.0
+
+    def finalize(self) -> None:
+        """Mark the uploads as complete"""
+        self.end_time = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a dictionary"""
+        with self._lock:
+            outcomes = list(self.outcomes)
+        return {
+            "requested": len(outcomes),
+            "uploaded": self.count(UPLOADED),
+            "rejected": self.count(REJECTED),
+            "failed": self.count(FAILED),
+            "bytes_sent": self.bytes_sent,
+            "throughput_mb_per_second": round(self.throughput() / 1_000_000, 3),
+            "outcomes": outcomes,
+            "duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time else None
+        }
+
+
+class UploadQueue:
+    """Uploads images on a bounded pool of workers, tracking progress and throughput"""
+
+    def __init__(self, api_client: 'CatApiClient', max_workers: int = DEFAULT_UPLOAD_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, chunked: bool = False,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, on_progress: Optional[ProgressCallback] = None):
+        """
+        Initialize the upload queue
+        Args:
+            api_client: The Cat API client
+            max_workers: Maximum number of uploads in flight at once
+            max_pending: Uploads queued or in flight before submit() blocks, bounding open files
+            chunked: Whether to send bodies with chunked transfer encoding
+            chunk_size: Bytes read from each source per chunk
+            on_progress: Called with (total bytes sent, total bytes queued) as chunks go out
+        """
+        assert max_workers > 0, "Worker count must be positive"
+        assert max_pending >= max_workers, "Pending uploads must be at least the worker count"
+        self.api_client = api_client
+        self.chunked = chunked
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.report = UploadReport()
+        self.bytes_queued = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload")
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    def _progress(self, sent_delta: int) -> None:
+        self.report.add_bytes(sent_delta)
+        if self.on_progress is not None:
+            self.on_progress(self.report.bytes_sent, self.bytes_queued)
+
+    def _upload_one(self, stream: MultipartStream, index: int) -> Dict[str, Any]:
+        outcome = {"index": index, "filename": stream.filename, "id": None, "status": FAILED,
+                   "status_code": None, "bytes": stream.total_size(), "seconds": None, "error": None}
+        started = time.perf_counter()
+        try:
+            response = self.api_client.send_upload(stream)
+        except (requests.RequestException, CircuitOpenError) as e:
+            # An open circuit fails this file without aborting the queue
+            outcome["error"] = str(e)
+        else:
+            outcome["status_code"] = response.status_code
+            if response.status_code in [200, 201]:
+                outcome["id"] = json_codec.loads(response.content).get("id")
+                outcome["status"] = UPLOADED
+            else:
+                outcome["status"] = REJECTED if response.status_code in [400, 413, 415] else FAILED
+                outcome["error"] = response.text
+        finally:
+            outcome["seconds"] = round(time.perf_counter() - started, 4)
+            self._slots.release()
+
+        self.report.add_outcome(outcome)
+        if outcome["status"] != UPLOADED:
+            print(f"Warning: Failed to upload {stream.filename}: {outcome['status_code']}, {outcome['error']}")
+        return outcome
+
+    def submit(self, source: UploadSource, sub_id: Optional[str] = None,
+               filename: Optional[str] = None) -> Future:
+        """
+        Queue a file for upload, blocking while too many uploads are pending
+        Args:
+            source: File path, bytes-like object, memory map or binary file object
+            sub_id: Optional ID of the user the image belongs to
+            filename: File name sent to the API
+        Returns:
+            Future resolving to the upload's outcome dictionary
+        """
+        last_sent = [0]
+
+        def on_progress(sent: int, total: Optional[int]) -> None:
+            # A retried upload starts counting again from zero
+            delta = sent - last_sent[0] if sent >= last_sent[0] else sent
+            last_sent[0] = sent
+            self._progress(delta)
+
+        stream = create_multipart_stream(
+            source, chunked=self.chunked, filename=filename,
+            fields={"sub_id": sub_id} if sub_id else None,
+            chunk_size=self.chunk_size, on_progress=on_progress
+        )
+        # Take the slot only once the stream exists, so a bad source can't leak it
+        self._slots.acquire()
+        try:
+            with self._lock:
+                index = len(self._futures)
+                # Run in a copy of the caller's context so each upload is traced under the caller's span
+                future = self._executor.submit(contextvars.copy_context().run, self._upload_one, stream, index)
+                self._futures.append(future)
+                self.bytes_queued += stream.total_size() or 0
+        except BaseException:
+            self._slots.release()
+            raise
+        return future
+
+    @traced()
+    def join(self) -> UploadReport:
+        """
+        Wait for every queued upload to finish
+        Returns:
+            Report with the outcome of every upload, in submission order
+        """
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result()
+        self._executor.shutdown()
+        self.report.finalize()
+        self.report.outcomes.sort(key=lambda outcome: outcome["index"])
+        summary = self.report.to_dict()
+        print(f"Uploaded {summary['uploaded']}/{summary['requested']} images, {summary['bytes_sent']} bytes "
+              f"in {summary['duration_seconds']}s ({summary['throughput_mb_per_second']} MB/s)")
+        return self.report
+
+    def __enter__(self) -> 'UploadQueue':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.join()
@@ -1,7 +1,8 @@
-import json
 import time
 from typing import Dict, Any, Optional
 
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+
 
 class VoteGenerationResult:
     """Class to store and manage the results of vote generation"""
@@ -11,6 +12,7 @@ class VoteGenerationResult:
         self.images = []
         self.votes = []
         self.errors = []
+        self.discrepancies = []
         self.start_time = time.time()
         self.end_time = None
 
@@ -26,12 +28,20 @@ class VoteGenerationResult:
         self.votes.append(vote_data)
         self.total_votes += 1
 
-    def add_error(self, error_message: str) -> None:
-        """Add an error to the results"""
-        self.errors.append({
+    def add_error(self, error_message: str, context: Optional[Dict[str, Any]] = None) -> None:
+        """Add an error to the results, with optional details such as the vote it belongs to"""
+        error = {
             "timestamp": time.time(),
             "message": error_message
-        })
+        }
+        if context:
+            error.update(context)
+        self.errors.append(error)
+
+    @property
+    def error_count(self) -> int:
+        """Number of errors recorded"""
+        return len(self.errors)
 
     def update_image_vote_count(self, image_id: str, vote_count: int) -> None:
         """Update the verified vote count for an image"""
@@ -40,6 +50,10 @@ class VoteGenerationResult:
                 img["verified_vote_count"] = vote_count
                 break
 
+    def add_discrepancy(self, discrepancy: Dict[str, Any]) -> None:
+        """Add an image whose verified votes don't match the votes cast"""
+        self.discrepancies.append(discrepancy)
+
     def finalize(self) -> None:
         """Mark the generation as complete"""
         self.end_time = time.time()
@@ -51,16 +65,14 @@ class VoteGenerationResult:
             "images": self.images,
             "votes": self.votes,
             "errors": self.errors,
+            "discrepancies": self.discrepancies,
             "duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time else None,
             "timestamp": int(self.start_time)
         }
 
-    def save_to_file(self, filename: Optional[str] = None) -> str:
-        """Save the results to a JSON file"""
+    def save_to_file(self, filename: Optional[str] = None, compact: bool = False) -> str:
+        """Save the results to an indented JSON file, or a compact one for machine consumers"""
         if not filename:
             filename = f"catapi_votes_{int(self.start_time)}.json"
 
-        with open(filename, "w") as f:
-            json.dump(self.to_dict(), f, indent=2)
-
-        return filename
+        return json_codec.dump_to_file(self.to_dict(), filename, compact=compact)
@@ -3,17 +3,19 @@
 CatAPI Bug Reporter
 This script automatically creates a Jira ticket when the test_vote_count_increases test fails.
 It captures relevant information about the failure and formats it into a structured bug report.
+Run it from the repository root: python -m C7_Reporting.S21_Send_Bug_To_Jira.bug_reporter --help
 """
 
 import os
 import sys
-import json
 import logging
 import argparse
 import requests
 from datetime import datetime
 from requests.auth import HTTPBasicAuth
 
+from C6_Analysis.S19_Refactor_Builder.Result import json_codec
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -68,7 +70,7 @@ class JiraBugReporter:
         api_response_text = "Not provided"
         if api_responses:
             api_response_text = "```json\n"
-            api_response_text += json.dumps(api_responses, indent=2)
+            api_response_text += json_codec.dumps(api_responses, compact=False).decode('utf-8')
             api_response_text += "\n```"
 
         # Create description with all collected information
@@ -114,7 +116,7 @@ h2. Possible Causes
         # Create the issue in Jira
         url = f"{self.jira_url}/rest/api/2/issue"
 
-        payload = json.dumps({
+        payload = json_codec.dumps({
             "fields": {
                 "project": {
                     "key": self.project_key
@@ -143,7 +145,7 @@ h2. Possible Causes
             )
 
             if response.status_code == 201:
-                result = response.json()
+                result = json_codec.loads(response.content)
                 logger.info(f"Successfully created Jira issue: {result['key']}")
                 return result
             else:
@@ -287,9 +289,9 @@ def main():
     api_responses = None
     if args.api_responses and os.path.exists(args.api_responses):
         try:
-            with open(args.api_responses, 'r') as f:
-                api_responses = json.load(f)
-        except json.JSONDecodeError:
+            with open(args.api_responses, 'rb') as f:
+                api_responses = json_codec.loads(f.read())
+        except ValueError:
             logger.error(f"Error parsing API responses file: {args.api_responses}")
             api_responses = {"error": "Failed to parse API responses"}
 